@@ -1,7 +1,7 @@
 # ======================================================================
 #                    PROYECTO: BIBLIOTECA INTELIGENTE
-#        Estructuras: Lista Ligada, Cola, Pila, Arbol, Grafo
-#        Algoritmos: Burbuja, Busqueda Secuencial, Busqueda Binaria
+#    Estructuras: Lista Ligada, Skip List, Cola, Pila, Arbol, Grafo
+#        Algoritmos: Burbuja, Merge Sort, Busqueda Secuencial y Binaria
 # ======================================================================
 # El sistema administra una biblioteca usando varias estructuras de datos
 # fundamentales. Permite manejar libros, usuarios, prestamos, categorias
@@ -9,14 +9,70 @@
 # completo y comentarios explicativos estilo B (tecnico y humano).
 # ======================================================================
 
-from dataclasses import dataclass, field
-from typing import Optional, Any, List, Dict
+from dataclasses import dataclass, field, fields, MISSING
+from typing import Optional, Any, List, Dict, Tuple
 import os
+import re
+import sys
+import bisect
+import csv
+import gc
+import heapq
+import json
+import math
 import pickle
+import random
+import threading
+import time
+import tracemalloc
+import unicodedata
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
 from tabulate import tabulate
 import tkinter as tk
 from tkinter import scrolledtext
 
+try:
+    # NumPy es opcional: si esta instalado se usa para vectorizar calculos
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    # readline es opcional (no existe en Windows): habilita Tab en input()
+    import readline
+except ImportError:
+    readline = None
+
+# ======================================================================
+#region REGISTROS COMPACTOS (__slots__)
+# ======================================================================
+# Node, Book, User y TreeNode se crean por millones, asi que son
+# dataclasses con slots=True: sin __dict__ por instancia cada objeto
+# ocupa bastante menos. Los datos guardados antes de este cambio traen
+# su estado como diccionario, que un objeto con slots no sabe cargar;
+# restaurar_estado acepta ambos formatos y completa con el valor por
+# defecto los campos que no existian cuando se guardo el archivo.
+# ======================================================================
+
+# Funcion: restaurar_estado
+def restaurar_estado(obj, state):
+    # pickle llama a __setstate__ con un dict (datos viejos) o con la
+    # tupla (None, slots) que genera object.__getstate__ para slots
+    if isinstance(state, tuple):
+        dict_state, slot_state = state
+        state = {**(dict_state or {}), **(slot_state or {})}
+    for f in fields(obj):
+        if f.name in state:
+            object.__setattr__(obj, f.name, state[f.name])
+        elif f.default is not MISSING:
+            object.__setattr__(obj, f.name, f.default)
+        elif f.default_factory is not MISSING:
+            object.__setattr__(obj, f.name, f.default_factory())
+
+
 # ======================================================================
 #region LISTA LIGADA
 # ======================================================================
@@ -25,34 +81,36 @@ from tkinter import scrolledtext
 # Usamos esta estructura para mostrar que trabajamos con punteros/links.
 # ======================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     # Nodo basico para la lista ligada: almacena 'data' y el puntero 'next'
     data: Any
     next: Optional['Node'] = None
 
+    __setstate__ = restaurar_estado
+
 
 class LinkedList:
 # Funcion: __init__
     def __init__(self):
         # head apunta al primer nodo; si es None, la lista esta vacia
         self.head: Optional[Node] = None
+        # tail apunta al ultimo nodo para que append no recorra la lista
+        self.tail: Optional[Node] = None
 
 # Funcion: append
     def append(self, data):
-        # Inserta un nuevo nodo al final de la lista
+        # Inserta un nuevo nodo al final de la lista en O(1)
         new_node = Node(data)
 
         if not self.head:
             # Si la lista esta vacia, el nuevo nodo es la cabeza
-            self.head = new_node
+            self.head = self.tail = new_node
             return
 
-        # Si no, recorremos hasta el ultimo nodo y enlazamos
-        cur = self.head
-        while cur.next:
-            cur = cur.next
-        cur.next = new_node
+        # Si no, enlazamos despues del ultimo nodo
+        self.tail.next = new_node
+        self.tail = new_node
 
 # Funcion: find
     def find(self, predicate) -> Optional[Any]:
@@ -77,6 +135,8 @@ class LinkedList:
                     prev.next = cur.next
                 else:
                     self.head = cur.next
+                if cur is self.tail:
+                    self.tail = prev
                 return True
             prev = cur
             cur = cur.next
@@ -101,6 +161,343 @@ class LinkedList:
             cur = cur.next
 
 
+# ======================================================================
+#region LISTA LIGADA DESENROLLADA
+# ======================================================================
+# Variante de la lista ligada donde cada nodo guarda un bloque de hasta
+# CAPACIDAD elementos en una lista de Python. Hay un nodo cada muchos
+# elementos en vez de uno por elemento: menos objetos creados y los
+# recorridos (find, __iter__) avanzan por bloques contiguos en lugar
+# de seguir un puntero por elemento. Misma API que LinkedList.
+# ======================================================================
+
+@dataclass(slots=True)
+class UnrolledNode:
+    # Bloque de elementos consecutivos y puntero al bloque siguiente
+    items: List[Any] = field(default_factory=list)
+    next: Optional['UnrolledNode'] = None
+
+    __setstate__ = restaurar_estado
+
+
+class UnrolledLinkedList:
+    CAPACIDAD = 64
+
+# Funcion: __init__
+    def __init__(self):
+        self.head: Optional[UnrolledNode] = None
+        self.tail: Optional[UnrolledNode] = None
+        self._largo = 0
+
+# Funcion: append
+    def append(self, data):
+        # Agrega al ultimo bloque; si esta lleno abre uno nuevo (O(1))
+        if self.tail is None:
+            self.head = self.tail = UnrolledNode()
+        elif len(self.tail.items) >= self.CAPACIDAD:
+            self.tail.next = UnrolledNode()
+            self.tail = self.tail.next
+        self.tail.items.append(data)
+        self._largo += 1
+
+# Funcion: find
+    def find(self, predicate) -> Optional[Any]:
+        # Busca el primer elemento que cumpla 'predicate', bloque a bloque
+        bloque = self.head
+        while bloque:
+            for data in bloque.items:
+                if predicate(data):
+                    return data
+            bloque = bloque.next
+        return None
+
+# Funcion: remove
+    def remove(self, predicate) -> bool:
+        # Elimina el primer elemento que cumpla 'predicate'. Si el bloque
+        # queda a menos de la mitad se junta con el siguiente cuando ambos
+        # entran en uno; si queda vacio se desenlaza
+        prev = None
+        bloque = self.head
+        while bloque:
+            for i, data in enumerate(bloque.items):
+                if predicate(data):
+                    del bloque.items[i]
+                    self._largo -= 1
+                    self._reacomodar(prev, bloque)
+                    return True
+            prev = bloque
+            bloque = bloque.next
+        return False
+
+# Funcion: insert
+    def insert(self, posicion: int, data):
+        # Inserta en la posicion dada (la usa el deshacer de una baja para
+        # devolver el elemento a su lugar). Si el bloque se pasa de la
+        # capacidad se parte en dos mitades
+        if posicion >= self._largo:
+            self.append(data)
+            return
+        bloque = self.head
+        while posicion > len(bloque.items):
+            posicion -= len(bloque.items)
+            bloque = bloque.next
+        bloque.items.insert(posicion, data)
+        self._largo += 1
+        if len(bloque.items) > self.CAPACIDAD:
+            mitad = self.CAPACIDAD // 2
+            bloque.next = UnrolledNode(bloque.items[mitad:], bloque.next)
+            del bloque.items[mitad:]
+            if bloque is self.tail:
+                self.tail = bloque.next
+
+# Funcion: pop
+    def pop(self):
+        # Quita y devuelve el ultimo elemento (deshacer un append). Solo si
+        # el ultimo bloque queda vacio hay que buscar el anterior
+        data = self.tail.items.pop()
+        self._largo -= 1
+        if not self.tail.items:
+            prev = None
+            bloque = self.head
+            while bloque is not self.tail:
+                prev, bloque = bloque, bloque.next
+            self._reacomodar(prev, bloque)
+        return data
+
+# Funcion: _reacomodar
+    def _reacomodar(self, prev: Optional[UnrolledNode], bloque: UnrolledNode):
+        if not bloque.items:
+            if prev:
+                prev.next = bloque.next
+            else:
+                self.head = bloque.next
+            if bloque is self.tail:
+                self.tail = prev
+            return
+        sig = bloque.next
+        if (sig and len(bloque.items) < self.CAPACIDAD // 2
+                and len(bloque.items) + len(sig.items) <= self.CAPACIDAD):
+            bloque.items.extend(sig.items)
+            bloque.next = sig.next
+            # El bloque absorbido queda vacio: una marca de leer_desde
+            # que apuntaba a el ya no es valida
+            sig.items = []
+            if sig is self.tail:
+                self.tail = bloque
+
+# Funcion: ubicar_despues
+    def ubicar_despues(self, bloque: Optional[UnrolledNode], clave,
+                       key) -> Tuple[Optional[UnrolledNode], int]:
+        # Para una lista ordenada por 'key': (bloque, indice) del primer
+        # elemento con key > clave, o (None, 0). Empieza en 'bloque' si
+        # sigue enlazado (no quedo vacio) y no esta pasado de la clave; si
+        # no, desde el principio. Salta de a bloques y dentro del bloque
+        # usa busqueda binaria
+        if bloque is None or not bloque.items or key(bloque.items[0]) > clave:
+            bloque = self.head
+        while bloque is not None and key(bloque.items[-1]) <= clave:
+            bloque = bloque.next
+        if bloque is None:
+            return None, 0
+        return bloque, bisect.bisect_right(bloque.items, clave, key=key)
+
+# Funcion: leer_desde
+    def leer_desde(self, bloque: Optional[UnrolledNode], indice: int,
+                   cantidad: int) -> Tuple[List[Any], Optional[UnrolledNode], int]:
+        # Hasta 'cantidad' elementos desde bloque.items[indice], mas el
+        # bloque y el indice donde seguir (el bloque es el del ultimo
+        # elemento leido). Cuesta O(cantidad) sin importar cuantos
+        # elementos hay antes
+        res: List[Any] = []
+        while bloque is not None:
+            tomados = bloque.items[indice:indice + cantidad - len(res)]
+            res.extend(tomados)
+            indice += len(tomados)
+            if len(res) == cantidad:
+                break
+            bloque, indice = bloque.next, 0
+        return res, bloque, indice
+
+# Funcion: to_list
+    def to_list(self) -> List[Any]:
+        # Copia los elementos a una lista de Python, un bloque a la vez
+        result = []
+        bloque = self.head
+        while bloque:
+            result.extend(bloque.items)
+            bloque = bloque.next
+        return result
+
+# Funcion: __iter__
+    def __iter__(self):
+        bloque = self.head
+        while bloque:
+            yield from bloque.items
+            bloque = bloque.next
+
+# Funcion: __len__
+    def __len__(self):
+        return self._largo
+
+
+# ======================================================================
+#region SKIP LIST (LISTA ORDENADA)
+# ======================================================================
+# Lista ligada con varios niveles de "atajos": cada nodo aparece en el
+# nivel 0 y, con probabilidad 1/2, tambien en el siguiente nivel. Asi
+# insertar, buscar por clave y recorrer rangos cuesta O(log n) en
+# promedio y los elementos siempre quedan ordenados por 'key'. Tiene la
+# misma interfaz que LinkedList (append/find/remove/__iter__).
+# ======================================================================
+
+class SkipNode:
+# Funcion: __init__
+    def __init__(self, data, nivel: int):
+        # 'next' tiene un puntero por nivel en el que aparece el nodo
+        self.data = data
+        self.next: List[Optional['SkipNode']] = [None] * nivel
+
+
+class SkipList:
+    MAX_NIVEL = 32
+    PROBABILIDAD = 0.5
+
+# Funcion: __init__
+    def __init__(self, key=lambda x: x):
+        # head es un nodo centinela sin datos presente en todos los niveles
+        self.key = key
+        self.head = SkipNode(None, SkipList.MAX_NIVEL)
+        self.nivel = 1
+        self.size = 0
+        self._rnd = random.Random()
+
+# Funcion: _nivel_aleatorio
+    def _nivel_aleatorio(self) -> int:
+        nivel = 1
+        while nivel < SkipList.MAX_NIVEL and self._rnd.random() < SkipList.PROBABILIDAD:
+            nivel += 1
+        return nivel
+
+# Funcion: _predecesores
+    def _predecesores(self, k, incluir_iguales: bool) -> List[SkipNode]:
+        # Para cada nivel, el ultimo nodo con clave < k (o <= k si
+        # incluir_iguales); es donde se enlaza o desenlaza
+        update = [self.head] * SkipList.MAX_NIVEL
+        x = self.head
+        for i in range(self.nivel - 1, -1, -1):
+            while x.next[i] is not None:
+                kn = self.key(x.next[i].data)
+                if kn < k or (incluir_iguales and kn == k):
+                    x = x.next[i]
+                else:
+                    break
+            update[i] = x
+        return update
+
+# Funcion: insert
+    def insert(self, data):
+        # Inserta en orden; con claves iguales queda despues de las existentes
+        update = self._predecesores(self.key(data), incluir_iguales=True)
+        nivel = self._nivel_aleatorio()
+        if nivel > self.nivel:
+            self.nivel = nivel
+        nuevo = SkipNode(data, nivel)
+        for i in range(nivel):
+            nuevo.next[i] = update[i].next[i]
+            update[i].next[i] = nuevo
+        self.size += 1
+
+# Funcion: append
+    def append(self, data):
+        # En una lista ordenada "agregar" es insertar en su posicion
+        self.insert(data)
+
+# Funcion: find
+    def find(self, predicate) -> Optional[Any]:
+        # Igual que LinkedList.find: recorre el nivel 0
+        for data in self:
+            if predicate(data):
+                return data
+        return None
+
+# Funcion: find_key
+    def find_key(self, k) -> Optional[Any]:
+        # Primer elemento con clave exactamente k, en O(log n)
+        data = self.ceiling(k)
+        if data is not None and self.key(data) == k:
+            return data
+        return None
+
+# Funcion: remove
+    def remove(self, predicate) -> bool:
+        # Busca el primer elemento que cumpla predicate (recorrido lineal,
+        # como LinkedList) y lo desenlaza de todos sus niveles
+        cur = self.head.next[0]
+        while cur is not None and not predicate(cur.data):
+            cur = cur.next[0]
+        if cur is None:
+            return False
+        self._desenlazar(cur)
+        return True
+
+# Funcion: _desenlazar
+    def _desenlazar(self, objetivo: SkipNode):
+        # Parte de los predecesores por clave y avanza entre claves iguales
+        # hasta encontrar el nodo exacto en cada nivel donde aparece
+        update = self._predecesores(self.key(objetivo.data), incluir_iguales=False)
+        for i in range(len(objetivo.next)):
+            x = update[i]
+            while x.next[i] is not objetivo:
+                x = x.next[i]
+            x.next[i] = objetivo.next[i]
+        while self.nivel > 1 and self.head.next[self.nivel - 1] is None:
+            self.nivel -= 1
+        self.size -= 1
+
+# Funcion: floor
+    def floor(self, k) -> Optional[Any]:
+        # Ultimo elemento con clave <= k (None si no hay)
+        x = self._predecesores(k, incluir_iguales=True)[0]
+        return None if x is self.head else x.data
+
+# Funcion: ceiling
+    def ceiling(self, k) -> Optional[Any]:
+        # Primer elemento con clave >= k (None si no hay)
+        nodo = self._predecesores(k, incluir_iguales=False)[0].next[0]
+        return None if nodo is None else nodo.data
+
+# Funcion: range
+    def range(self, desde=None, hasta=None, incluir_hasta=True):
+        # Recorre en orden los elementos con desde <= clave <= hasta
+        # (o clave < hasta si incluir_hasta es False). None = sin limite
+        if desde is None:
+            cur = self.head.next[0]
+        else:
+            cur = self._predecesores(desde, incluir_iguales=False)[0].next[0]
+        while cur is not None:
+            if hasta is not None:
+                k = self.key(cur.data)
+                if k > hasta or (k == hasta and not incluir_hasta):
+                    return
+            yield cur.data
+            cur = cur.next[0]
+
+# Funcion: to_list
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+# Funcion: __iter__
+    def __iter__(self):
+        cur = self.head.next[0]
+        while cur is not None:
+            yield cur.data
+            cur = cur.next[0]
+
+# Funcion: __len__
+    def __len__(self):
+        return self.size
+
+
 # ======================================================================
 #region COLA (FIFO)
 # ======================================================================
@@ -111,7 +508,7 @@ class LinkedList:
 class Queue:
 # Funcion: __init__
     def __init__(self):
-        # items guardara tuplas (user_id, isbn) para solicitudes
+        # items guardara tuplas (user_id, book_id) para solicitudes
         self.items: List[Any] = []
 
 # Funcion: enqueue
@@ -154,17 +551,22 @@ class Stack:
 # Funcion: __init__
     def __init__(self):
         self.items: List[Any] = []
+        # Cuenta cada push/pop, para saber si la pila cambio desde un
+        # momento dado (por ejemplo, desde el ultimo guardado)
+        self.cambios = 0
 
 # Funcion: push
     def push(self, item):
         # Empila una accion o registro
         self.items.append(item)
+        self.cambios += 1
 
 # Funcion: pop
     def pop(self) -> Optional[Any]:
         # Desapila y devuelve el ultimo elemento
         if not self.items:
             return None
+        self.cambios += 1
         return self.items.pop()
 
 # Funcion: peek
@@ -184,14 +586,33 @@ class Stack:
 #region ARBOL GENERAL PARA CATEGORIAS
 # ======================================================================
 # Implementacion simple de un arbol general (n hijos). Cada TreeNode
-# representa una categoria o subcategoria y contiene una lista de titulos.
+# representa una categoria o subcategoria y guarda los ids de sus libros
+# en 'miembros', un bitmap comprimido: pertenencia, altas y bajas en
+# O(log n) y algebra de conjuntos rapida entre categorias. Los libros se
+# muestran en orden de id (el orden en que se agregaron al catalogo) y
+# los titulos se resuelven solo al mostrar.
 # ======================================================================
 
-@dataclass
+@dataclass(slots=True)
 class TreeNode:
     name: str
-    books: List[str] = field(default_factory=list)
     children: List['TreeNode'] = field(default_factory=list)
+    miembros: 'RoaringBitmap' = field(default_factory=lambda: RoaringBitmap(), repr=False)
+    # Titulos de archivos muy viejos (antes de los ids), hasta que
+    # _reindexar los traduce a ids
+    titulos_legado: Optional[List[str]] = field(default=None, repr=False)
+
+# Funcion: __setstate__
+    def __setstate__(self, state):
+        # Los archivos anteriores al bitmap guardaban la lista 'books' (de
+        # ids o, mas atras, de titulos): los ids pasan a 'miembros'
+        restaurar_estado(self, state)
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        if "miembros" not in state:
+            libros = state.get("books", [])
+            self.miembros = RoaringBitmap(b for b in libros if not isinstance(b, str))
+            self.titulos_legado = [b for b in libros if isinstance(b, str)] or None
 
 # Funcion: add_child
     def add_child(self, child_name: str) -> 'TreeNode':
@@ -223,9 +644,9 @@ class TreeNode:
         return None
 
 # Funcion: add_book
-    def add_book(self, category_path: List[str], book_title: str) -> bool:
+    def add_book(self, category_path: List[str], book_id: int) -> bool:
         # Agrega un libro a la categoria indicada; si faltan subcategorias
-        # las crea con add_child, luego agrega el titulo en la lista 'books'
+        # las crea con add_child, luego agrega el id en 'miembros'
         node = self
         if node.name != category_path[0]:
             # El path no es valido para esta raiz
@@ -234,62 +655,84 @@ class TreeNode:
         for part in category_path[1:]:
             node = node.add_child(part)
 
-        node.books.append(book_title)
+        node.miembros.add(book_id)
         return True
 
+# Funcion: subtree_bitmap
+    def subtree_bitmap(self) -> 'RoaringBitmap':
+        # Union de los bitmaps de esta categoria y todas sus subcategorias
+        res = self.miembros
+        for child in self.children:
+            res = res | child.subtree_bitmap()
+        return res
+
+# Funcion: iter_books
+    def iter_books(self):
+        # Ids de libros de esta categoria y de todas sus subcategorias,
+        # sin repetir si un libro esta en varias (en orden de id)
+        return iter(self.subtree_bitmap())
+
 # Funcion: remove_book
-    def remove_book(self, book_title: str):
+    def remove_book(self, book_id: int):
         # Elimina el libro de esta categoría y de todas las subcategorías recursivamente
-        if book_title in self.books:
-            self.books.remove(book_title)
+        self.miembros.discard(book_id)
         for child in self.children:
-            child.remove_book(book_title)
+            child.remove_book(book_id)
 
 # Funcion: show
-    def show(self, level=0, is_last=True, prefix=""):
+    def show(self, level=0, is_last=True, prefix="", label=str):
         # Diseño visual tipo árbol con ramas y colores ANSI si consola lo soporta
+        # 'label' convierte cada id de libro en el texto a mostrar (su titulo)
         branch = "└── " if is_last else "├── "
         # ANSI color codes (azul para categorías, verde para libros)
         RESET = "\033[0m"
         BLUE = "\033[94m"
         GREEN = "\033[92m"
         # Mostrar nombre de la categoría
-        print(f"{prefix}{branch}{BLUE}{self.name}{RESET} ({len(self.books)} libros)")
+        libros = list(self.miembros)
+        print(f"{prefix}{branch}{BLUE}{self.name}{RESET} ({len(libros)} libros)")
         # Mostrar libros de la categoría
-        for i, b in enumerate(self.books):
-            is_last_book = (i == len(self.books) - 1) and not self.children
+        for i, b in enumerate(libros):
+            is_last_book = (i == len(libros) - 1) and not self.children
             book_branch = "    " if is_last else "│   "
             book_prefix = prefix + (book_branch if len(self.children) > 0 or not is_last_book else "    ")
             book_symbol = "└── " if is_last_book else "├── "
-            print(f"{book_prefix}{book_symbol}{GREEN}{b}{RESET}")
+            print(f"{book_prefix}{book_symbol}{GREEN}{label(b)}{RESET}")
         # Mostrar hijos (subcategorías)
         for idx, child in enumerate(self.children):
             is_last_child = idx == len(self.children) - 1
             child_prefix = prefix + ("    " if is_last else "│   ")
-            child.show(level + 1, is_last_child, child_prefix)
+            child.show(level + 1, is_last_child, child_prefix, label)
 
 
 # ======================================================================
 #region GRAFO
 # ======================================================================
 # Grafo no dirigido usando lista de adyacencia (diccionario).
-# Cada clave es un titulo y su valor es lista de titulos relacionados.
+# Cada clave es el id de un libro y su valor la lista de ids relacionados.
 # ======================================================================
 
 class Graph:
 # Funcion: __init__
     def __init__(self):
-        # adj almacena las listas de adyacencia: titulo -> [titulos relacionados]
-        self.adj: Dict[str, List[str]] = {}
+        # adj almacena las listas de adyacencia: id -> [ids relacionados]
+        self.adj: Dict[int, List[int]] = {}
 
 # Funcion: add_node
-    def add_node(self, title: str):
+    def add_node(self, node: int):
         # Si el nodo no existe, crearlo con lista vacia
-        if title not in self.adj:
-            self.adj[title] = []
+        if node not in self.adj:
+            self.adj[node] = []
+
+# Funcion: remove_node
+    def remove_node(self, node: int):
+        # Quita el nodo y todas las aristas que lo tocan
+        for vecino in self.adj.pop(node, []):
+            if node in self.adj.get(vecino, []):
+                self.adj[vecino].remove(node)
 
 # Funcion: add_edge
-    def add_edge(self, a: str, b: str):
+    def add_edge(self, a: int, b: int):
         # Crea una arista no dirigida entre a y b
         # Aseguramos que ambos nodos existan
         self.add_node(a)
@@ -301,111 +744,2204 @@ class Graph:
         if a not in self.adj[b]:
             self.adj[b].append(a)
 
+# Funcion: remove_edge
+    def remove_edge(self, a: int, b: int):
+        # Quita la arista a-b si existe (en ambas direcciones)
+        if b in self.adj.get(a, []):
+            self.adj[a].remove(b)
+        if a in self.adj.get(b, []):
+            self.adj[b].remove(a)
+
 # Funcion: neighbors
-    def neighbors(self, title: str) -> List[str]:
+    def neighbors(self, node: int) -> List[int]:
         # Devuelve la lista de vecinos (libros relacionados)
-        return list(self.adj.get(title, []))
+        return list(self.adj.get(node, []))
+
+# Funcion: show
+    def show(self, label=str):
+        # Muestra el grafo: para cada libro imprime su lista de relacionados
+        # 'label' convierte cada id en el texto a mostrar
+        for k, vs in self.adj.items():
+            print(f"{label(k)}: {[label(v) for v in vs]}")
+
+# Funcion: related_by_two_steps
+    def related_by_two_steps(self, node: int) -> List[int]:
+        # Ejemplo de operacion en grafo: encontrar libros a distancia 2
+        # Esto sirve para sugerir "amigos de amigos" (libros relacionados por via intermedia)
+        res = set()
+        direct = set(self.neighbors(node))
+        for nb in direct:
+            for nb2 in self.neighbors(nb):
+                if nb2 != node and nb2 not in direct:
+                    res.add(nb2)
+        return list(res)
+
+
+# ======================================================================
+#region DISPOSICION DEL GRAFO (LAYOUT)
+# ======================================================================
+# Calcula posiciones para dibujar el grafo usando el algoritmo de fuerzas
+# de Fruchterman-Reingold: las aristas atraen a sus extremos y todos los
+# nodos cercanos se repelen entre si. Se usa la variante de rejilla del
+# algoritmo: solo se repelen nodos de celdas vecinas, asi cada iteracion
+# cuesta O(n) y no O(n^2). Con NumPy los pares se arman vectorizados.
+# ======================================================================
+
+# Funcion: calcular_layout
+def calcular_layout(n: int, aristas: List[Tuple[int, int]], iteraciones=60,
+                    separacion=80.0, semilla=7) -> List[Tuple[float, float]]:
+    # n es la cantidad de nodos y 'aristas' pares de indices (i, j).
+    # 'separacion' es la distancia ideal entre nodos (en pixeles del mundo)
+    if n == 0:
+        return []
+    if n == 1:
+        return [(0.0, 0.0)]
+    if np is not None:
+        return _layout_numpy(n, aristas, iteraciones, separacion, semilla)
+    return _layout_python(n, aristas, iteraciones, separacion, semilla)
+
+
+# Funcion: _layout_numpy
+def _layout_numpy(n, aristas, iteraciones, k, semilla):
+    rng = np.random.default_rng(semilla)
+    lado = k * math.sqrt(n)
+    pos = rng.random((n, 2)) * lado
+    if aristas:
+        extremos = np.asarray(aristas, dtype=np.int64)
+        a, b = extremos[:, 0], extremos[:, 1]
+    radio = 2 * k          # alcance de la repulsion (tamaño de celda)
+    k2, r2 = k * k, radio * radio
+    temp = lado / 10
+    for _ in range(iteraciones):
+        desp = np.zeros((n, 2))
+        # Repulsion: k^2 / d en la direccion de delta, solo entre pares
+        # de celdas vecinas (misma rejilla que la version sin NumPy).
+        # Cada par sale una sola vez y empuja a sus dos nodos
+        i, j = _pares_cercanos(pos, radio)
+        delta = pos[i] - pos[j]
+        dist2 = np.einsum("ij,ij->i", delta, delta)
+        cerca = dist2 < r2
+        i, j, delta, dist2 = i[cerca], j[cerca], delta[cerca], dist2[cerca]
+        fuerza = delta * (k2 / np.maximum(dist2, 0.01))[:, None]
+        for eje in (0, 1):
+            desp[:, eje] += np.bincount(i, weights=fuerza[:, eje], minlength=n)
+            desp[:, eje] -= np.bincount(j, weights=fuerza[:, eje], minlength=n)
+        # Atraccion: d^2 / k a lo largo de cada arista
+        if aristas:
+            delta = pos[a] - pos[b]
+            dist = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+            fuerza = delta * (dist / k)[:, None]
+            np.subtract.at(desp, a, fuerza)
+            np.add.at(desp, b, fuerza)
+        # Limitar el desplazamiento por la temperatura y enfriar
+        largo = np.sqrt(np.einsum("ij,ij->i", desp, desp))
+        np.maximum(largo, 0.01, out=largo)
+        pos += desp * (np.minimum(largo, temp) / largo)[:, None]
+        temp *= 0.95
+    return [tuple(p) for p in pos.tolist()]
+
+
+# Funcion: _pares_cercanos
+def _pares_cercanos(pos, radio):
+    # Pares {i, j} de nodos que caen en la misma celda o en celdas vecinas,
+    # cada uno una sola vez: se miran 4 de las 8 vecinas (las otras 4 dan
+    # los mismos pares al reves) y en la propia celda solo i < j.
+    # Cada celda recibe una clave entera; con los nodos ordenados
+    # por clave, los de una celda son un tramo contiguo que se ubica con
+    # searchsorted, y np.repeat arma todos los pares sin bucles en Python
+    celda = np.floor(pos / radio).astype(np.int64)
+    celda -= celda.min(axis=0)
+    ancho = int(celda[:, 1].max()) + 3
+    clave = (celda[:, 0] + 1) * ancho + celda[:, 1] + 1
+    orden = np.argsort(clave, kind="stable")
+    ordenadas = clave[orden]
+    nodos = np.arange(len(pos))
+    pares_i, pares_j = [], []
+    for ox, oy in ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1)):
+        vecina = clave + ox * ancho + oy
+        ini = np.searchsorted(ordenadas, vecina, "left")
+        cuenta = np.searchsorted(ordenadas, vecina, "right") - ini
+        total = int(cuenta.sum())
+        if total == 0:
+            continue
+        # Posicion dentro de 'orden' de cada par: inicio del tramo de
+        # la celda vecina + indice correlativo dentro de ese tramo
+        salto = np.repeat(ini - (np.cumsum(cuenta) - cuenta), cuenta)
+        i = np.repeat(nodos, cuenta)
+        j = orden[np.arange(total) + salto]
+        if ox == oy == 0:
+            propios = i < j
+            i, j = i[propios], j[propios]
+        pares_i.append(i)
+        pares_j.append(j)
+    return np.concatenate(pares_i), np.concatenate(pares_j)
+
+
+# Funcion: _layout_python
+def _layout_python(n, aristas, iteraciones, k, semilla):
+    rnd = random.Random(semilla)
+    lado = k * math.sqrt(n)
+    xs = [rnd.random() * lado for _ in range(n)]
+    ys = [rnd.random() * lado for _ in range(n)]
+    radio = 2 * k          # alcance de la repulsion (tamaño de celda)
+    k2, r2 = k * k, radio * radio
+    temp = lado / 10
+    for _ in range(iteraciones):
+        dx = [0.0] * n
+        dy = [0.0] * n
+        # Repartir los nodos en celdas de la rejilla
+        celdas: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(n):
+            celdas.setdefault((int(xs[i] // radio), int(ys[i] // radio)), []).append(i)
+        # Repulsion solo contra nodos de las 9 celdas vecinas
+        for (cx, cy), miembros in celdas.items():
+            cercanos = []
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    cercanos.extend(celdas.get((cx + ox, cy + oy), ()))
+            for i in miembros:
+                xi, yi = xs[i], ys[i]
+                fx = fy = 0.0
+                for j in cercanos:
+                    if j == i:
+                        continue
+                    ddx, ddy = xi - xs[j], yi - ys[j]
+                    d2 = ddx * ddx + ddy * ddy
+                    if d2 < r2:
+                        f = k2 / max(d2, 0.01)
+                        fx += ddx * f
+                        fy += ddy * f
+                dx[i] += fx
+                dy[i] += fy
+        # Atraccion a lo largo de las aristas
+        for a, b in aristas:
+            ddx, ddy = xs[a] - xs[b], ys[a] - ys[b]
+            f = math.hypot(ddx, ddy) / k
+            dx[a] -= ddx * f
+            dy[a] -= ddy * f
+            dx[b] += ddx * f
+            dy[b] += ddy * f
+        # Mover cada nodo como maximo 'temp' y enfriar
+        for i in range(n):
+            largo = math.hypot(dx[i], dy[i])
+            if largo > 0:
+                paso = min(largo, temp) / largo
+                xs[i] += dx[i] * paso
+                ys[i] += dy[i] * paso
+        temp *= 0.95
+    return list(zip(xs, ys))
+
+
+# ======================================================================
+#region ALGORITMOS: ORDENAMIENTO, BUSQUEDAS
+# ======================================================================
+# Implementaciones basicas y explicadas de los algoritmos solicitados.
+# Burbuja: sencillo de implementar, suficiente para volumenes pequenos.
+# Merge sort: O(n log n) y estable, para volumenes grandes.
+# Busqueda secuencial: para listas no ordenadas.
+# Busqueda binaria: para listas ya ordenadas (mejor rendimiento).
+# Todos los ordenamientos calculan key() una sola vez por elemento
+# (decorar-ordenar-desdecorar) y ordenan indices, no los objetos.
+# ======================================================================
+
+# Hasta este tamaño burbuja es competitiva; por encima se usa Timsort
+UMBRAL_BURBUJA = 16
+# Tamaño de los tramos que merge_sort ordena por insercion antes de mezclar
+TRAMO_INSERCION = 32
+# Lotes de hasta este tamaño se insertan o quitan de a uno en los arreglos
+# ordenados (busqueda binaria y un corrimiento en C por elemento); con mas
+# conviene copiar el arreglo una sola vez (merge_sorted o por tramos). La
+# copia cuesta mas de lo que parece: toca el contador de referencias de
+# cada elemento, el corrimiento no
+UMBRAL_MEZCLA = 128
+
+
+# Funcion: bubble_sort
+def bubble_sort(items: List[Any], key=lambda x: x) -> List[Any]:
+    # Ordena una copia de 'items' usando el criterio 'key'
+    # Devuelve la lista ordenada (no modifica la original)
+    keys = [key(x) for x in items]
+    arr = list(range(len(items)))
+    n = len(arr)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            if keys[arr[j]] > keys[arr[j + 1]]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swapped = True
+        if not swapped:
+            # Si en una pasada no se intercambió nada, ya esta ordenado
+            break
+    return [items[i] for i in arr]
+
+
+# Funcion: merge_sort
+def merge_sort(items: List[Any], key=lambda x: x) -> List[Any]:
+    # Merge sort de abajo hacia arriba, estable, estilo Timsort: primero
+    # ordena tramos cortos por insercion y luego los mezcla de a pares
+    keys = [key(x) for x in items]
+    n = len(items)
+    orden = list(range(n))
+
+    # 1) Insercion dentro de cada tramo de TRAMO_INSERCION elementos
+    for ini in range(0, n, TRAMO_INSERCION):
+        fin = min(ini + TRAMO_INSERCION, n)
+        for i in range(ini + 1, fin):
+            actual = orden[i]
+            j = i - 1
+            while j >= ini and keys[orden[j]] > keys[actual]:
+                orden[j + 1] = orden[j]
+                j -= 1
+            orden[j + 1] = actual
+
+    # 2) Mezclar tramos vecinos duplicando el ancho en cada pasada
+    aux = orden[:]
+    ancho = TRAMO_INSERCION
+    while ancho < n:
+        for ini in range(0, n, 2 * ancho):
+            medio = min(ini + ancho, n)
+            fin = min(ini + 2 * ancho, n)
+            i, j, k = ini, medio, ini
+            while i < medio and j < fin:
+                # '<' estricto en el lado derecho mantiene la estabilidad
+                if keys[orden[j]] < keys[orden[i]]:
+                    aux[k] = orden[j]
+                    j += 1
+                else:
+                    aux[k] = orden[i]
+                    i += 1
+                k += 1
+            # Copiar lo que quede (solo uno de los dos lados tiene restos)
+            aux[k:fin] = orden[i:medio] if i < medio else orden[j:fin]
+        orden, aux = aux, orden
+        ancho *= 2
+    return [items[i] for i in orden]
+
+
+# Funcion: ordenar
+def ordenar(items: List[Any], key=lambda x: x, algoritmo: Optional[str] = None) -> List[Any]:
+    # Punto de entrada para ordenar: elige el algoritmo segun el tamaño.
+    # algoritmo puede forzarse con "burbuja", "merge" o "timsort".
+    if algoritmo is None:
+        algoritmo = "burbuja" if len(items) <= UMBRAL_BURBUJA else "timsort"
+    if algoritmo == "burbuja":
+        return bubble_sort(items, key)
+    if algoritmo == "merge":
+        return merge_sort(items, key)
+    if algoritmo == "timsort":
+        # sorted() de Python es Timsort en C y tambien calcula key una vez
+        return sorted(items, key=key)
+    raise ValueError(f"Algoritmo de ordenamiento desconocido: {algoritmo}")
+
+
+# Funcion: sequential_search
+def sequential_search(items: List[Any], predicate):
+    # Recorre 'items' y devuelve el primer elemento que cumpla predicate
+    for item in items:
+        if predicate(item):
+            return item
+    return None
+
+
+# Funcion: binary_search
+def binary_search(sorted_items: List[Any], target, key=lambda x: x):
+    # Busqueda binaria en lista ya ordenada segun 'key'
+    lo, hi = 0, len(sorted_items) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        mid_val = key(sorted_items[mid])
+        if mid_val == target:
+            return sorted_items[mid]
+        elif mid_val < target:
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return None
+
+
+# ----------------------------------------------------------------------
+# Busqueda binaria sobre un arreglo de claves precalculadas ('keys'
+# ordenado ascendente). Devuelven posiciones, no elementos, asi que
+# sirven para sacar rangos completos en O(log n + k). Delegan en el
+# modulo bisect (en C): se usan en caminos calientes como los bitmaps
+# y los indices de texto.
+# ----------------------------------------------------------------------
+
+# Funcion: lower_bound
+def lower_bound(keys: List[Any], target, lo=0, hi=None) -> int:
+    # Primera posicion i con keys[i] >= target (len(keys) si no hay)
+    return bisect.bisect_left(keys, target, lo, hi)
+
+
+# Funcion: upper_bound
+def upper_bound(keys: List[Any], target, lo=0, hi=None) -> int:
+    # Primera posicion i con keys[i] > target (len(keys) si no hay)
+    return bisect.bisect_right(keys, target, lo, hi)
+
+
+# Funcion: equal_range
+def equal_range(keys: List[Any], target) -> Tuple[int, int]:
+    # Rango [i, j) de posiciones cuya clave es igual a target
+    i = lower_bound(keys, target)
+    return i, upper_bound(keys, target, lo=i)
+
+
+# Funcion: key_range
+def key_range(keys: List[Any], desde, hasta) -> Tuple[int, int]:
+    # Rango [i, j) con desde <= clave <= hasta (ambos incluidos)
+    i = lower_bound(keys, desde)
+    return i, max(i, upper_bound(keys, hasta, lo=i))
+
+
+# Funcion: prefix_range
+def prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    # Rango [i, j) de claves (texto) que empiezan con 'prefix'. Todas ellas
+    # estan entre prefix y el "sucesor" del prefijo (ultima letra + 1)
+    i = lower_bound(keys, prefix)
+    if not prefix:
+        return i, len(keys)
+    ultimo = ord(prefix[-1])
+    if ultimo < 0x10FFFF:
+        return i, lower_bound(keys, prefix[:-1] + chr(ultimo + 1), lo=i)
+    # Caso extremo sin sucesor posible: avanzar mientras coincida
+    j = i
+    while j < len(keys) and keys[j].startswith(prefix):
+        j += 1
+    return i, j
+
+
+# Funcion: merge_sorted
+def merge_sorted(keys: List[Any], nuevas: List[Any], ids: Optional[List[Any]] = None,
+                 nuevos_ids: Optional[List[Any]] = None):
+    # Mezcla 'nuevas' (ya ordenadas) dentro de 'keys' (ordenada) en
+    # O(n + k log n): busqueda binaria por cada nueva y copia por tramos.
+    # Entre claves iguales las existentes quedan primero (como upper_bound).
+    # 'ids' y 'nuevos_ids' se mueven en paralelo si se pasan. Usa
+    # bisect_right directo (upper_bound sin la llamada extra) porque se llama
+    # una vez por elemento del lote. Devuelve (claves, ids) nuevas
+    res_k: List[Any] = []
+    res_i: List[Any] = []
+    i = 0
+    for n, clave in enumerate(nuevas):
+        j = bisect.bisect_right(keys, clave, i)
+        res_k.extend(keys[i:j])
+        res_k.append(clave)
+        if ids is not None:
+            res_i.extend(ids[i:j])
+            res_i.append(nuevos_ids[n])
+        i = j
+    res_k.extend(keys[i:])
+    if ids is not None:
+        res_i.extend(ids[i:])
+    return res_k, res_i
+
+# Funcion: find_all
+def find_all(sorted_items: List[Any], keys: List[Any], target) -> List[Any]:
+    # Todos los elementos cuya clave es target (no solo uno como binary_search)
+    i, j = equal_range(keys, target)
+    return sorted_items[i:j]
+
+
+# ======================================================================
+#region VISTAS ORDENADAS
+# ======================================================================
+# Una vista ordenada mantiene los ids de los libros ordenados por un
+# criterio (titulo, autor, ...) sin tocar la lista ligada original. Se
+# actualiza con insercion binaria (bisect) en cada alta, baja o cambio,
+# asi listar en cualquier orden es solo recorrer la vista.
+# ======================================================================
+
+class SortedView:
+# Funcion: __init__
+    def __init__(self, key):
+        # key(book) -> clave de orden. 'valores' guarda las claves ya
+        # calculadas (arreglo para busqueda binaria) e 'ids' el id del libro
+        # en la misma posicion. Entre claves iguales se respeta la llegada
+        self.key = key
+        self.valores: List[Any] = []
+        self.ids: List[int] = []
+        self._clave_de: Dict[int, Any] = {}
+
+# Funcion: add
+    def add(self, book):
+        # Inserta el libro en su posicion (busqueda O(log n))
+        self._insertar(self.key(book), book.book_id)
+
+# Funcion: _insertar
+    def _insertar(self, clave, book_id: int):
+        self._clave_de[book_id] = clave
+        i = upper_bound(self.valores, clave)
+        self.valores.insert(i, clave)
+        self.ids.insert(i, book_id)
+
+# Funcion: add_many
+    def add_many(self, books):
+        # Inserta un lote. Un lote chico va libro por libro; uno grande se
+        # ordena y se mezcla una sola vez con la vista (O(n + k log n) en
+        # vez de k inserciones de O(n)). Las dos formas dejan el mismo orden
+        pares = [(self.key(b), b.book_id) for b in books]
+        if len(pares) <= UMBRAL_MEZCLA:
+            for clave, book_id in pares:
+                self._insertar(clave, book_id)
+            return
+        pares = ordenar(pares, key=lambda p: p[0])
+        for clave, book_id in pares:
+            self._clave_de[book_id] = clave
+        self.valores, self.ids = merge_sorted(self.valores, [p[0] for p in pares],
+                                              self.ids, [p[1] for p in pares])
+
+# Funcion: _posicion
+    def _posicion(self, book_id: int) -> int:
+        # Posicion actual del libro, buscando por la clave con la que se
+        # inserto (por si el libro ya cambio, por ejemplo su disponibilidad)
+        i, j = equal_range(self.valores, self._clave_de[book_id])
+        return self.ids.index(book_id, i, j)
+
+# Funcion: remove
+    def remove(self, book_id: int) -> bool:
+        if book_id not in self._clave_de:
+            return False
+        k = self._posicion(book_id)
+        del self.valores[k]
+        del self.ids[k]
+        del self._clave_de[book_id]
+        return True
+
+# Funcion: update
+    def update(self, book):
+        # Reubica un libro cuya clave pudo haber cambiado
+        self.remove(book.book_id)
+        self.add(book)
+
+# Funcion: remove_many
+    def remove_many(self, book_ids) -> int:
+        # Quita varios libros. Un lote chico va libro por libro; en uno
+        # grande cada libro se ubica con busqueda binaria y la vista se
+        # copia una sola vez por tramos (sin recorrerla elemento a
+        # elemento). Devuelve cuantos quito
+        quitar = [i for i in dict.fromkeys(book_ids) if i in self._clave_de]
+        if len(quitar) <= UMBRAL_MEZCLA:
+            for book_id in quitar:
+                self.remove(book_id)
+            return len(quitar)
+        posiciones = ordenar([self._posicion(i) for i in quitar])
+        for book_id in quitar:
+            del self._clave_de[book_id]
+        valores: List[Any] = []
+        ids: List[int] = []
+        desde = 0
+        for k in posiciones:
+            valores.extend(self.valores[desde:k])
+            ids.extend(self.ids[desde:k])
+            desde = k + 1
+        valores.extend(self.valores[desde:])
+        ids.extend(self.ids[desde:])
+        self.valores, self.ids = valores, ids
+        return len(quitar)
+
+# Funcion: rebuild
+    def rebuild(self, books):
+        # Reconstruye la vista completa (al cargar datos) en O(n log n);
+        # el ordenamiento es estable, asi que se respeta el orden de 'books'
+        pares = ordenar([(self.key(b), b.book_id) for b in books], key=lambda p: p[0])
+        self.valores = [p[0] for p in pares]
+        self.ids = [p[1] for p in pares]
+        self._clave_de = dict(zip(self.ids, self.valores))
+
+# Funcion: __iter__
+    def __iter__(self):
+        # Recorre los ids en orden
+        return iter(self.ids)
+
+# Funcion: __len__
+    def __len__(self):
+        return len(self.ids)
+
+
+# ======================================================================
+#region VISTAS PEREZOSAS DEL CATALOGO
+# ======================================================================
+# Una CatalogView no copia libros: guarda una funcion que, cada vez que
+# se recorre, genera los libros desde la estructura original (lista
+# ligada, vista ordenada, ...). Cortar o filtrar crea otra vista encima
+# de la anterior, asi que nada se materializa hasta que se itera y solo
+# se recorre lo necesario. Como la fuente se vuelve a leer en cada
+# recorrido, la vista refleja el estado actual del catalogo.
+# ======================================================================
+
+@dataclass
+class CatalogCursor:
+    # Marca donde termino una pagina: el orden usado, la clave de orden y
+    # el id del ultimo libro entregado (para retomar con busqueda binaria).
+    # En el orden del almacen (orden=None) 'clave' es el bloque de la
+    # lista desenrollada donde quedo, o la clave de la SkipList
+    orden: Optional[str]
+    clave: Any
+    book_id: int
+
+
+class CatalogView:
+# Funcion: __init__
+    def __init__(self, fuente, largo=None):
+        # fuente() -> iterador nuevo de libros; largo() -> tamaño en O(1)
+        # si se conoce (si no, len() recorre la vista contando)
+        self._fuente = fuente
+        self._largo = largo
+
+# Funcion: __iter__
+    def __iter__(self):
+        return iter(self._fuente())
+
+# Funcion: __len__
+    def __len__(self):
+        if self._largo is not None:
+            return self._largo()
+        return sum(1 for _ in self)
+
+# Funcion: __bool__
+    def __bool__(self):
+        # Basta con ver si existe un primer libro
+        return next(iter(self), None) is not None
+
+# Funcion: __getitem__
+    def __getitem__(self, idx):
+        # v[i] avanza i posiciones sin copiar; v[a:b:c] devuelve otra vista.
+        # Los indices negativos necesitan el largo (O(1) si se conoce)
+        if isinstance(idx, slice):
+            if any(v is not None and v < 0 for v in (idx.start, idx.stop)):
+                idx = slice(*idx.indices(len(self)))
+            paso = idx.step or 1
+            if paso < 0:
+                raise ValueError("Las vistas del catalogo no admiten paso negativo")
+            largo = None
+            if self._largo is not None:
+                largo = lambda: len(range(*idx.indices(self._largo())))
+            return CatalogView(lambda: islice(self._fuente(), idx.start, idx.stop, paso), largo)
+        if idx < 0:
+            idx += len(self)
+        if idx >= 0:
+            for libro in islice(self, idx, None):
+                return libro
+        raise IndexError("Indice fuera de la vista")
+
+# Funcion: filter
+    def filter(self, predicate) -> 'CatalogView':
+        # Vista con los libros que cumplen 'predicate' (se evalua al recorrer)
+        return CatalogView(lambda: filter(predicate, self._fuente()))
+
+# Funcion: first
+    def first(self):
+        # Primer libro de la vista o None
+        return next(iter(self), None)
+
+# Funcion: paginas
+    def paginas(self, tamano: int):
+        # Genera la vista en listas de a lo sumo 'tamano' libros; solo una
+        # pagina vive en memoria a la vez
+        it = iter(self)
+        while True:
+            pagina = list(islice(it, tamano))
+            if not pagina:
+                return
+            yield pagina
+
+
+# ======================================================================
+#region INDICES DE TEXTO NORMALIZADO
+# ======================================================================
+# Para buscar "cien anos" y encontrar "Cien Años" normalizamos el texto:
+# casefold (minusculas robustas), sin acentos (NFKD y quitando marcas
+# combinantes) y espacios colapsados. La clave normalizada de cada libro
+# se calcula una sola vez al indexarlo y se guarda; luego un diccionario
+# resuelve busquedas exactas y un arreglo ordenado de claves distintas
+# resuelve busquedas por prefijo con busqueda binaria.
+# ======================================================================
+
+# Funcion: normalizar_texto
+def normalizar_texto(texto: str, prefijo=False) -> str:
+    # Con prefijo=True se conserva un espacio final ("Cien " no es "Cien").
+    # Un texto ASCII no tiene acentos: se evita recorrerlo caracter a caracter
+    if texto.isascii():
+        sin_acentos = texto
+    else:
+        sin_acentos = "".join(c for c in unicodedata.normalize("NFKD", texto)
+                              if not unicodedata.combining(c))
+    normal = " ".join(sin_acentos.casefold().split())
+    if prefijo and normal and texto[-1:].isspace():
+        normal += " "
+    return normal
+
+
+class NormalizedIndex:
+# Funcion: __init__
+    def __init__(self, campo):
+        # campo(book) -> texto a indexar (por ejemplo el titulo)
+        self.campo = campo
+        self.exacto: Dict[str, List[int]] = {}   # clave normalizada -> ids
+        self.claves: List[str] = []              # claves distintas ordenadas
+        self._clave_de: Dict[int, str] = {}      # id -> clave ya calculada
+
+# Funcion: clave_de
+    def clave_de(self, book_id: int) -> Optional[str]:
+        # Clave normalizada guardada para un libro indexado
+        return self._clave_de.get(book_id)
+
+# Funcion: add
+    def add(self, book):
+        clave = normalizar_texto(self.campo(book))
+        self._clave_de[book.book_id] = clave
+        ids = self.exacto.get(clave)
+        if ids is None:
+            # Clave nueva: insertarla en el arreglo ordenado
+            self.exacto[clave] = [book.book_id]
+            self.claves.insert(lower_bound(self.claves, clave), clave)
+        elif ids and book.book_id < ids[-1]:
+            # Libro restaurado (deshacer): vuelve a su lugar por id
+            bisect.insort(ids, book.book_id)
+        else:
+            ids.append(book.book_id)
+
+# Funcion: add_many
+    def add_many(self, books):
+        # Como add para un lote: si hay muchas claves nuevas se mezclan de
+        # una vez; si son pocas se insertan de a una
+        nuevas = []
+        for b in books:
+            clave = normalizar_texto(self.campo(b))
+            self._clave_de[b.book_id] = clave
+            ids = self.exacto.get(clave)
+            if ids is None:
+                self.exacto[clave] = [b.book_id]
+                nuevas.append(clave)
+            else:
+                ids.append(b.book_id)
+        if len(nuevas) <= UMBRAL_MEZCLA:
+            for clave in nuevas:
+                self.claves.insert(lower_bound(self.claves, clave), clave)
+        else:
+            self.claves, _ = merge_sorted(self.claves, ordenar(nuevas))
+
+# Funcion: remove
+    def remove(self, book_id: int) -> bool:
+        clave = self._clave_de.pop(book_id, None)
+        if clave is None:
+            return False
+        ids = self.exacto[clave]
+        ids.remove(book_id)
+        if not ids:
+            # Era el ultimo libro con esa clave
+            del self.exacto[clave]
+            del self.claves[lower_bound(self.claves, clave)]
+        return True
+
+# Funcion: rebuild
+    def rebuild(self, books):
+        # Reconstruccion completa (al cargar datos)
+        self.exacto = {}
+        self._clave_de = {}
+        for b in books:
+            clave = normalizar_texto(self.campo(b))
+            self._clave_de[b.book_id] = clave
+            self.exacto.setdefault(clave, []).append(b.book_id)
+        self.claves = ordenar(list(self.exacto))
+
+# Funcion: find
+    def find(self, texto: str) -> List[int]:
+        # Ids cuya clave normalizada coincide exactamente, O(1)
+        return list(self.exacto.get(normalizar_texto(texto), ()))
+
+# Funcion: prefix
+    def prefix(self, texto: str) -> List[int]:
+        # Ids cuya clave empieza con el prefijo normalizado: O(log n + k)
+        i, j = prefix_range(self.claves, normalizar_texto(texto, prefijo=True))
+        res: List[int] = []
+        for clave in self.claves[i:j]:
+            res.extend(self.exacto[clave])
+        return res
+
+
+# ======================================================================
+#region INDICE INVERTIDO (BUSQUEDA POR PALABRAS CON BM25)
+# ======================================================================
+# Para cada palabra (termino) guardamos la lista de libros donde aparece
+# (posting list) y cuantas veces. Las listas son arreglos compactos
+# ordenados por id: array('I') para ids y array('H') para frecuencias,
+# unos 6 bytes por par (termino, libro), asi la memoria crece de forma
+# predecible con el catalogo. Los resultados se ordenan con BM25, que
+# premia terminos raros y normaliza por el largo del texto.
+# Borrar un libro solo lo marca (tombstone); las listas se compactan
+# cuando los borrados acumulados pasan de un umbral. Por eso el IDF no
+# usa el largo de la lista sino un contador de libros vivos por termino.
+# Cada lista tiene ademas un resumen por bloque (mayor frecuencia, menor
+# largo) que acota el puntaje de sus libros: la busqueda con todas las
+# palabras salta los bloques que no pueden entrar al top-k.
+# ======================================================================
+
+# Funcion: tokenizar
+def tokenizar(texto: str) -> List[str]:
+    # Palabras normalizadas (sin mayusculas ni acentos)
+    return re.findall(r"\w+", normalizar_texto(texto))
+
+
+class InvertedIndex:
+    K1 = 1.2        # saturacion de la frecuencia del termino
+    B = 0.75        # peso de la normalizacion por largo del documento
+    MAX_TF = 65535  # tope de array('H')
+    BLOQUE = 128    # posiciones por bloque de una posting list
+
+# Funcion: __init__
+    def __init__(self, campos=lambda b: (b.title, b.author)):
+        # campos(book) -> textos a indexar (por defecto titulo y autor)
+        self.campos = campos
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        # Por cada bloque de BLOQUE posiciones de una posting list: la
+        # mayor frecuencia y el menor largo de documento. Con eso se acota
+        # el mejor puntaje posible del bloque sin recorrerlo
+        self.bloques: Dict[str, Tuple[array, array]] = {}
+        # Libros vivos (sin contar los borrados) que contienen cada
+        # termino: es la frecuencia de documento que usa el IDF
+        self.docs_con: Dict[str, int] = {}
+        self.largo_doc = array("H")   # largo en tokens por id (0 = no indexado)
+        self.total_docs = 0
+        self.total_tokens = 0
+        self._borrados = set()
+
+# Funcion: _terminos
+    def _terminos(self, book) -> Counter:
+        return Counter(t for texto in self.campos(book) for t in tokenizar(texto))
+
+# Funcion: add
+    def add(self, book):
+        book_id = book.book_id
+        frecuencias = self._terminos(book)
+        largo = min(sum(frecuencias.values()), InvertedIndex.MAX_TF)
+        for termino in frecuencias:
+            self.docs_con[termino] = self.docs_con.get(termino, 0) + 1
+        self.total_docs += 1
+        self.total_tokens += largo
+        if book_id in self._borrados:
+            # Un id borrado que vuelve (al deshacer una baja): los ids no se
+            # reutilizan, asi que es el mismo libro y sus postings siguen
+            # en las listas; basta con volver a contarlo
+            self._borrados.discard(book_id)
+            self.largo_doc[book_id] = max(largo, 1)
+            return
+        if book_id >= len(self.largo_doc):
+            self.largo_doc.extend([0] * (book_id + 1 - len(self.largo_doc)))
+        self.largo_doc[book_id] = largo = max(largo, 1)
+        for termino, tf in frecuencias.items():
+            tf = min(tf, InvertedIndex.MAX_TF)
+            ids, tfs = self.postings.setdefault(termino, (array("I"), array("H")))
+            # Los ids nuevos son siempre los mayores: normalmente es un append
+            if not ids or ids[-1] < book_id:
+                ids.append(book_id)
+                tfs.append(tf)
+                maximos, minimos = self.bloques.setdefault(termino, (array("H"), array("H")))
+                if (len(ids) - 1) % InvertedIndex.BLOQUE == 0:
+                    maximos.append(tf)
+                    minimos.append(largo)
+                else:
+                    maximos[-1] = max(maximos[-1], tf)
+                    minimos[-1] = min(minimos[-1], largo)
+            else:
+                i = lower_bound(ids, book_id)
+                ids.insert(i, book_id)
+                tfs.insert(i, tf)
+                # Se corren los bloques: rehacer el resumen de este termino
+                self._resumir(termino)
+
+# Funcion: remove
+    def remove(self, book) -> bool:
+        # Recibe el Book (no solo el id) para descontar sus terminos de
+        # docs_con; las posting lists se limpian al compactar
+        book_id = book.book_id
+        if book_id >= len(self.largo_doc) or not self.largo_doc[book_id]:
+            return False
+        for termino in self._terminos(book):
+            quedan = self.docs_con.get(termino, 0) - 1
+            if quedan > 0:
+                self.docs_con[termino] = quedan
+            else:
+                self.docs_con.pop(termino, None)
+        self.total_tokens -= self.largo_doc[book_id]
+        self.largo_doc[book_id] = 0
+        self.total_docs -= 1
+        self._borrados.add(book_id)
+        if len(self._borrados) > max(1000, self.total_docs // 4):
+            self._compactar()
+        return True
+
+# Funcion: _resumir
+    def _resumir(self, termino: str):
+        # Recalcula los maximos/minimos por bloque de una posting list.
+        # Un borrado tiene largo 0: la cota queda mas holgada, no invalida
+        ids, tfs = self.postings[termino]
+        maximos, minimos = array("H"), array("H")
+        for inicio in range(0, len(ids), InvertedIndex.BLOQUE):
+            fin = inicio + InvertedIndex.BLOQUE
+            maximos.append(max(tfs[inicio:fin]))
+            minimos.append(min(self.largo_doc[i] for i in ids[inicio:fin]))
+        self.bloques[termino] = (maximos, minimos)
+
+# Funcion: _compactar
+    def _compactar(self):
+        # Quita de las posting lists los ids marcados como borrados
+        borrados = self._borrados
+        self._borrados = set()
+        for termino in list(self.postings):
+            ids, tfs = self.postings[termino]
+            vivos = [i for i, book_id in enumerate(ids) if book_id not in borrados]
+            if not vivos:
+                del self.postings[termino]
+                self.bloques.pop(termino, None)
+            elif len(vivos) < len(ids):
+                self.postings[termino] = (array("I", (ids[i] for i in vivos)),
+                                          array("H", (tfs[i] for i in vivos)))
+                self._resumir(termino)
+
+# Funcion: rebuild
+    def rebuild(self, books):
+        # Reconstruccion completa; se indexa por id creciente para que
+        # todas las inserciones sean appends
+        self.postings = {}
+        self.bloques = {}
+        self.docs_con = {}
+        self.largo_doc = array("H")
+        self.total_docs = 0
+        self.total_tokens = 0
+        self._borrados = set()
+        for b in ordenar(list(books), key=lambda b: b.book_id):
+            self.add(b)
+
+# Funcion: memoria_bytes
+    def memoria_bytes(self) -> int:
+        # Bytes ocupados por los arreglos (sin contar el diccionario)
+        total = len(self.largo_doc) * self.largo_doc.itemsize
+        for ids, tfs in self.postings.values():
+            total += len(ids) * ids.itemsize + len(tfs) * tfs.itemsize
+        for maximos, minimos in self.bloques.values():
+            total += len(maximos) * maximos.itemsize + len(minimos) * minimos.itemsize
+        return total
+
+# Funcion: _mejores_con_todas
+    def _mejores_con_todas(self, listas, cotas, bm25, k) -> List[Tuple[int, float]]:
+        # Top-k de los libros que tienen todas las palabras (block-max).
+        # Se recorre la posting list mas corta de a bloques; para cada
+        # bloque se busca (busqueda binaria que avanza, nunca retrocede) el
+        # tramo de las demas listas que cae en su rango de ids. Si algun
+        # tramo esta vacio, o la suma de las cotas de esos bloques no le
+        # gana al k-esimo puntaje, el bloque se salta entero. Y cuando ni
+        # la suma de las cotas maximas le gana, se termina. Las
+        # frecuencias van en listas paralelas (una por palabra)
+        n = len(listas)
+        bloque = InvertedIndex.BLOQUE
+        orden = sorted(range(n), key=lambda t: len(listas[t][0]))
+        guia = orden[0]
+        ids0, tfs0 = listas[guia]
+        tope = sum(max(c) for c in cotas)
+        mejores: List[Tuple[float, int]] = []   # heap de (puntaje, -id)
+        desde = [0] * n
+        partes = [0.0] * n
+        tramos = [(0, 0)] * n
+        for inicio in range(0, len(ids0), bloque):
+            lleno = len(mejores) == k
+            if lleno and tope <= mejores[0][0]:
+                break
+            fin = min(inicio + bloque, len(ids0))
+            primero, ultimo = ids0[inicio], ids0[fin - 1]
+            partes[guia] = cotas[guia][inicio // bloque]
+            vacio = False
+            for t in orden[1:]:
+                ids = listas[t][0]
+                lo = bisect.bisect_left(ids, primero, desde[t])
+                hi = bisect.bisect_right(ids, ultimo, lo)
+                desde[t] = lo
+                if lo == hi:
+                    vacio = True
+                    break
+                tramos[t] = (lo, hi)
+                partes[t] = max(cotas[t][lo // bloque:(hi - 1) // bloque + 1])
+            if vacio or (lleno and sum(partes) <= mejores[0][0]):
+                continue
+            borrados = self._borrados
+            candidatos = [i for i in range(inicio, fin) if ids0[i] not in borrados]
+            frecs: List[Optional[List[int]]] = [None] * n
+            frecs[guia] = [tfs0[i] for i in candidatos]
+            candidatos = [ids0[i] for i in candidatos]
+            for t in orden[1:]:
+                ids, tfs = listas[t]
+                pos, hi = tramos[t]
+                quedan, tf_t = [], []
+                for j, book_id in enumerate(candidatos):
+                    pos = bisect.bisect_left(ids, book_id, pos, hi)
+                    if pos == hi:
+                        break
+                    if ids[pos] == book_id:
+                        quedan.append(j)
+                        tf_t.append(tfs[pos])
+                if len(quedan) < len(candidatos):
+                    candidatos = [candidatos[j] for j in quedan]
+                    for u in orden:
+                        if frecs[u] is not None:
+                            frecs[u] = [frecs[u][j] for j in quedan]
+                frecs[t] = tf_t
+                if not candidatos:
+                    break
+            for j, book_id in enumerate(candidatos):
+                largo = self.largo_doc[book_id]
+                # Sumar en el orden de la consulta, igual que las cotas
+                puntaje = sum(bm25(largo, frecs[t][j], t) for t in range(n))
+                # A igual puntaje gana el id menor (el que llego primero)
+                par = (puntaje, -book_id)
+                if len(mejores) < k:
+                    heapq.heappush(mejores, par)
+                elif par > mejores[0]:
+                    heapq.heapreplace(mejores, par)
+        return [(-menos_id, puntaje) for puntaje, menos_id in sorted(mejores, reverse=True)]
+
+# Funcion: buscar
+    def buscar(self, consulta: str, k=10, todas=True) -> List[Tuple[int, float]]:
+        # Devuelve hasta k pares (id, puntaje) ordenados por BM25.
+        # todas=True exige todas las palabras (interseccion); False basta una
+        terminos = list(dict.fromkeys(tokenizar(consulta)))
+        if not terminos or not self.total_docs or k <= 0:
+            return []
+        # Solo cuentan los terminos que algun libro vivo todavia contiene
+        terminos_vivos = [t for t in terminos if self.docs_con.get(t)]
+        if todas and len(terminos_vivos) < len(terminos):
+            return []
+        if not terminos_vivos:
+            return []
+        listas = [self.postings[t] for t in terminos_vivos]
+        n = self.total_docs
+        promedio = self.total_tokens / n or 1.0
+        idf = [math.log(1 + (n - self.docs_con[t] + 0.5) / (self.docs_con[t] + 0.5))
+               for t in terminos_vivos]
+        k1, b = InvertedIndex.K1, InvertedIndex.B
+
+        def bm25(largo, tf, t):
+            norma = k1 * (1 - b + b * largo / promedio)
+            return idf[t] * tf * (k1 + 1) / (tf + norma)
+
+        if todas:
+            cotas = []
+            for t, termino in enumerate(terminos_vivos):
+                maximos, minimos = self.bloques[termino]
+                cotas.append([bm25(largo, tf, t) for tf, largo in zip(maximos, minimos)])
+            return self._mejores_con_todas(listas, cotas, bm25, k)
+        puntajes: Dict[int, float] = {}
+        for t, (ids, tfs) in enumerate(listas):
+            for book_id, tf in zip(ids, tfs):
+                if book_id not in self._borrados:
+                    puntajes[book_id] = puntajes.get(book_id, 0.0) + bm25(self.largo_doc[book_id], tf, t)
+        # Top-k con un heap: O(candidatos log k)
+        return heapq.nlargest(k, puntajes.items(), key=lambda par: par[1])
+
+
+# ======================================================================
+#region INDICE DE TRIGRAMAS (BUSQUEDA TOLERANTE A ERRORES)
+# ======================================================================
+# Cada titulo normalizado se parte en trigramas ("  c", " ci", "cie",...).
+# Un error de tipeo solo cambia unos pocos trigramas (cada edicion afecta
+# a lo sumo 3), asi que un titulo a distancia <= d de la consulta
+# comparte al menos |Q| - 3d trigramas con ella. Con eso generamos pocos
+# candidatos y solo a ellos les calculamos la distancia de edicion, con
+# un limite para cortar el calculo apenas se supera. Antes de verificar
+# un candidato se descarta por largo (la distancia es al menos la
+# diferencia de largos). Cuando la consulta solo tiene trigramas comunes
+# ("Libro 12345" en un catalogo de "Libro N") casi todo es candidato:
+# por eso se revisan primero los que comparten mas trigramas raros y se
+# pone un tope a cuantos se revisan y verifican.
+# ======================================================================
+
+# Funcion: trigramas
+def trigramas(texto: str) -> List[str]:
+    # Trigramas distintos del texto con relleno (marca inicio y fin)
+    relleno = f"  {texto} "
+    return list(dict.fromkeys(relleno[i:i + 3] for i in range(len(relleno) - 2)))
+
+
+# Funcion: distancia_edicion
+def distancia_edicion(a: str, b: str, limite: int) -> int:
+    # Levenshtein acotado: devuelve limite + 1 si la distancia lo supera.
+    # Solo calcula la franja diagonal de ancho 2*limite+1 y corta cuando
+    # toda una fila ya excede el limite
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    if len(a) > len(b):
+        a, b = b, a
+    fuera = limite + 1
+    previa = [j if j <= limite else fuera for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        actual = [fuera] * (len(b) + 1)
+        actual[0] = i if i <= limite else fuera
+        desde, hasta = max(1, i - limite), min(len(b), i + limite)
+        minimo = actual[0]
+        ca = a[i - 1]
+        for j in range(desde, hasta + 1):
+            costo = 0 if ca == b[j - 1] else 1
+            v = min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + costo)
+            actual[j] = v if v <= limite else fuera
+            if actual[j] < minimo:
+                minimo = actual[j]
+        if minimo > limite:
+            return fuera
+        previa = actual
+    return previa[len(b)]
+
+
+class TrigramIndex:
+    MAX_CANDIDATOS = 2000     # candidatos que pasan el filtro de largo
+    MAX_VERIFICADOS = 200     # distancias de edicion calculadas
+
+# Funcion: __init__
+    def __init__(self, texto_de):
+        # texto_de(book_id) -> texto normalizado ya calculado (lo provee el
+        # indice de titulos, asi no se guarda otra copia de cada titulo)
+        self.texto_de = texto_de
+        self.postings: Dict[str, array] = {}   # trigrama -> ids ordenados
+        self._borrados = set()
+        self._vivos = 0
+
+# Funcion: add
+    def add(self, book_id: int):
+        if book_id in self._borrados:
+            # Mismo caso que InvertedIndex.add: el id vuelve con el mismo
+            # titulo y sus postings no se habian quitado
+            self._borrados.discard(book_id)
+            self._vivos += 1
+            return
+        for tri in trigramas(self.texto_de(book_id)):
+            ids = self.postings.setdefault(tri, array("I"))
+            if not ids or ids[-1] < book_id:
+                ids.append(book_id)
+            else:
+                ids.insert(lower_bound(ids, book_id), book_id)
+        self._vivos += 1
+
+# Funcion: remove
+    def remove(self, book_id: int):
+        # Marca el id como borrado; compacta si los borrados se acumulan
+        self._borrados.add(book_id)
+        self._vivos -= 1
+        if len(self._borrados) > max(1000, self._vivos // 4):
+            self._compactar()
+
+# Funcion: _compactar
+    def _compactar(self):
+        borrados = self._borrados
+        for tri in list(self.postings):
+            ids = self.postings[tri]
+            vivos = array("I", (i for i in ids if i not in borrados))
+            if vivos:
+                self.postings[tri] = vivos
+            else:
+                del self.postings[tri]
+        self._borrados = set()
+
+# Funcion: rebuild
+    def rebuild(self, book_ids):
+        self.postings = {}
+        self._borrados = set()
+        self._vivos = 0
+        for book_id in ordenar(list(book_ids)):
+            self.add(book_id)
+
+# Funcion: _contiene
+    @staticmethod
+    def _contiene(ids: array, book_id: int) -> bool:
+        i = bisect.bisect_left(ids, book_id)
+        return i < len(ids) and ids[i] == book_id
+
+# Funcion: buscar
+    def buscar(self, texto: str, k=5, max_dist: Optional[int] = None) -> List[Tuple[int, int]]:
+        # Devuelve hasta k pares (id, distancia) con distancia <= max_dist,
+        # los mas parecidos primero
+        consulta = normalizar_texto(texto)
+        if not consulta:
+            return []
+        if max_dist is None:
+            # Por defecto se tolera un error cada 4 caracteres (1 a 4)
+            max_dist = max(1, min(4, len(consulta) // 4))
+        tris = trigramas(consulta)
+        listas = ordenar([self.postings[t] for t in tris if t in self.postings], key=len)
+        if not listas:
+            return []
+        # Filtro por conteo: se necesitan 'minimo' trigramas en comun, asi
+        # que todo candidato aparece en alguna de las (faltan + 1) listas
+        # mas cortas; en las demas solo se verifica pertenencia. Los
+        # trigramas que no estan en el indice no los comparte nadie
+        minimo = max(1, len(tris) - 3 * max_dist)
+        faltan = len(listas) - minimo
+        if faltan < 0:
+            return []
+        semillas, resto = listas[:faltan + 1], listas[faltan + 1:]
+        conteo: Counter = Counter()
+        for ids in semillas:
+            conteo.update(ids)
+        # Primero los que comparten mas listas semilla (las mas raras): si
+        # hay que cortar por los topes, se cortan los menos prometedores
+        largo = len(consulta)
+        resultados = []
+        revisados = verificados = 0
+        for book_id in sorted(conteo, key=conteo.__getitem__, reverse=True):
+            comunes = conteo[book_id]
+            if comunes + len(resto) < minimo:
+                break           # los siguientes tienen aun menos en comun
+            if book_id in self._borrados:
+                continue
+            texto = self.texto_de(book_id)
+            if abs(len(texto) - largo) > max_dist:
+                continue
+            revisados += 1
+            if revisados > self.MAX_CANDIDATOS:
+                break
+            for ids in resto:
+                if comunes + len(resto) < minimo:
+                    break
+                if self._contiene(ids, book_id):
+                    comunes += 1
+            if comunes < minimo:
+                continue
+            dist = distancia_edicion(consulta, texto, max_dist)
+            if dist <= max_dist:
+                resultados.append((dist, -comunes, book_id))
+            verificados += 1
+            if verificados >= self.MAX_VERIFICADOS:
+                break
+        return [(book_id, dist) for dist, _, book_id in heapq.nsmallest(k, resultados)]
+
+
+# ======================================================================
+#region ARBOL RADIX (AUTOCOMPLETADO)
+# ======================================================================
+# Trie comprimido: cada arista guarda un tramo de texto en vez de una sola
+# letra, asi los titulos largos no generan miles de nodos. Para completar
+# un prefijo se baja por las aristas (O(largo del prefijo)) y luego se
+# recorre el subarbol en orden alfabetico hasta juntar N resultados; como
+# todo nodo interno tiene al menos dos hijos o es final de una clave, el
+# recorrido visita O(N) nodos ademas del camino.
+# ======================================================================
+
+class RadixNode:
+# Funcion: __init__
+    def __init__(self):
+        # hijos: primera letra -> (etiqueta de la arista, nodo hijo)
+        self.hijos: Dict[str, Tuple[str, 'RadixNode']] = {}
+        self.valores: Optional[List[Any]] = None   # no None = fin de clave
+
+
+class RadixTree:
+# Funcion: __init__
+    def __init__(self):
+        self.raiz = RadixNode()
+
+# Funcion: insert
+    def insert(self, clave: str, valor):
+        nodo, resto = self.raiz, clave
+        while resto:
+            etiqueta_hijo = nodo.hijos.get(resto[0])
+            if etiqueta_hijo is None:
+                # No hay arista con esa letra: colgar una hoja con todo el resto
+                hoja = RadixNode()
+                nodo.hijos[resto[0]] = (resto, hoja)
+                nodo = hoja
+                resto = ""
+                break
+            etiqueta, hijo = etiqueta_hijo
+            comun = 0
+            while comun < min(len(etiqueta), len(resto)) and etiqueta[comun] == resto[comun]:
+                comun += 1
+            if comun < len(etiqueta):
+                # Partir la arista en el punto donde difieren
+                medio = RadixNode()
+                medio.hijos[etiqueta[comun]] = (etiqueta[comun:], hijo)
+                nodo.hijos[resto[0]] = (etiqueta[:comun], medio)
+                hijo = medio
+            nodo, resto = hijo, resto[comun:]
+        if nodo.valores is None:
+            nodo.valores = []
+        nodo.valores.append(valor)
+
+# Funcion: remove
+    def remove(self, clave: str, valor) -> bool:
+        # Quita 'valor' de la clave y poda/fusiona nodos que queden de sobra
+        camino = []           # (padre, letra) de cada arista recorrida
+        nodo, resto = self.raiz, clave
+        while resto:
+            etiqueta_hijo = nodo.hijos.get(resto[0])
+            if etiqueta_hijo is None or not resto.startswith(etiqueta_hijo[0]):
+                return False
+            camino.append((nodo, resto[0]))
+            nodo, resto = etiqueta_hijo[1], resto[len(etiqueta_hijo[0]):]
+        if nodo.valores is None or valor not in nodo.valores:
+            return False
+        nodo.valores.remove(valor)
+        if nodo.valores:
+            return True
+        nodo.valores = None
+        if not camino:
+            return True
+        padre, letra = camino[-1]
+        if not nodo.hijos:
+            # Hoja vacia: eliminarla
+            del padre.hijos[letra]
+            if padre is self.raiz or padre.valores is not None or len(padre.hijos) != 1:
+                return True
+            # El padre quedo con un solo hijo: fusionarlo con su arista
+            nodo = padre
+            padre, letra = camino[-2]
+        if len(nodo.hijos) == 1:
+            etiqueta, _ = padre.hijos[letra]
+            (sub_etiqueta, nieto), = nodo.hijos.values()
+            padre.hijos[letra] = (etiqueta + sub_etiqueta, nieto)
+        return True
+
+# Funcion: completions
+    def completions(self, prefijo: str, n=10) -> List[Tuple[str, List[Any]]]:
+        # Hasta n pares (clave, valores) que empiezan con prefijo, en orden
+        nodo, resto, acumulado = self.raiz, prefijo, ""
+        while resto:
+            etiqueta_hijo = nodo.hijos.get(resto[0])
+            if etiqueta_hijo is None:
+                return []
+            etiqueta, hijo = etiqueta_hijo
+            if resto.startswith(etiqueta):
+                resto = resto[len(etiqueta):]
+            elif etiqueta.startswith(resto):
+                resto = ""
+            else:
+                return []
+            acumulado += etiqueta
+            nodo = hijo
+        resultado = []
+        pila = [(acumulado, nodo)]
+        while pila and len(resultado) < n:
+            texto, actual = pila.pop()
+            if actual.valores:
+                resultado.append((texto, list(actual.valores)))
+            # Apilar hijos al reves para sacarlos en orden alfabetico
+            for letra in sorted(actual.hijos, reverse=True):
+                etiqueta, hijo = actual.hijos[letra]
+                pila.append((texto + etiqueta, hijo))
+        return resultado
+
+
+# ======================================================================
+#region BITSETS
+# ======================================================================
+# Conjunto de enteros pequeños (ids de libro densos) guardado como bits
+# en un array('Q') de palabras de 64 bits: marcar o desmarcar un id es
+# O(1), la cantidad de elementos se lleva al dia en cada cambio y el
+# recorrido salta las palabras en cero. Las operaciones entre conjuntos
+# convierten a int de Python, que las hace en C palabra por palabra.
+# ======================================================================
+
+class Bitset:
+# Funcion: __init__
+    def __init__(self, ids=()):
+        self.palabras = array("Q")
+        self._cuenta = 0
+        for i in ids:
+            self.add(i)
+
+# Funcion: add
+    def add(self, i: int):
+        w, bit = i >> 6, 1 << (i & 63)
+        if w >= len(self.palabras):
+            self.palabras.extend([0] * (w + 1 - len(self.palabras)))
+        if not self.palabras[w] & bit:
+            self.palabras[w] |= bit
+            self._cuenta += 1
+
+# Funcion: discard
+    def discard(self, i: int):
+        w, bit = i >> 6, 1 << (i & 63)
+        if w < len(self.palabras) and self.palabras[w] & bit:
+            self.palabras[w] &= ~bit & 0xFFFFFFFFFFFFFFFF
+            self._cuenta -= 1
+
+# Funcion: __contains__
+    def __contains__(self, i: int) -> bool:
+        w = i >> 6
+        return w < len(self.palabras) and bool(self.palabras[w] >> (i & 63) & 1)
+
+# Funcion: __len__
+    def __len__(self):
+        # Popcount mantenido incrementalmente: O(1)
+        return self._cuenta
+
+# Funcion: __iter__
+    def __iter__(self):
+        # Recorre los ids en orden saltando palabras vacias; dentro de cada
+        # palabra extrae el bit mas bajo con w & -w
+        for w, palabra in enumerate(self.palabras):
+            base = w << 6
+            while palabra:
+                bajo = palabra & -palabra
+                yield base + bajo.bit_length() - 1
+                palabra ^= bajo
+
+# Funcion: to_int
+    def to_int(self) -> int:
+        return int.from_bytes(self.palabras.tobytes(), "little")
+
+# Funcion: from_int
+    @classmethod
+    def from_int(cls, valor: int) -> 'Bitset':
+        res = cls()
+        if valor:
+            nbytes = ((valor.bit_length() + 63) // 64) * 8
+            res.palabras = array("Q", valor.to_bytes(nbytes, "little"))
+            res._cuenta = valor.bit_count()
+        return res
+
+# Funcion: __and__
+    def __and__(self, otro: 'Bitset') -> 'Bitset':
+        return Bitset.from_int(self.to_int() & otro.to_int())
+
+# Funcion: __or__
+    def __or__(self, otro: 'Bitset') -> 'Bitset':
+        return Bitset.from_int(self.to_int() | otro.to_int())
+
+# Funcion: __sub__
+    def __sub__(self, otro: 'Bitset') -> 'Bitset':
+        return Bitset.from_int(self.to_int() & ~otro.to_int())
+
+# Funcion: count_and
+    def count_and(self, otro: 'Bitset') -> int:
+        # Tamaño de la interseccion sin construir el conjunto resultado
+        return (self.to_int() & otro.to_int()).bit_count()
+
+
+# ======================================================================
+#region MODELOS DE DATOS
+# ======================================================================
+# Definicion de clases simples para Book y User. Son dataclasses para
+# mayor claridad y menos codigo repetido, con slots para que cada
+# registro ocupe poco (ver REGISTROS COMPACTOS).
+# ======================================================================
+
+@dataclass(slots=True)
+class Book:
+    title: str
+    author: str
+    isbn: str
+    available: bool = True  # True si el libro esta disponible
+    book_id: int = 0        # Id entero asignado por Biblioteca (0 = sin asignar)
+
+    __setstate__ = restaurar_estado
+
+# Funcion: __str__
+    def __str__(self):
+        # Representacion legible del libro para imprimir en consola
+        status = "Disponible" if self.available else "Prestado"
+        return f"{self.title} by {self.author} (ISBN:{self.isbn}) - {status}"
+
+
+@dataclass(slots=True)
+class User:
+    user_id: str
+    name: str
+
+    __setstate__ = restaurar_estado
+
+# Funcion: __str__
+    def __str__(self):
+        return f"{self.user_id} - {self.name}"
+
+
+# ======================================================================
+#region BITMAPS COMPRIMIDOS (ESTILO ROARING)
+# ======================================================================
+# Los ids se agrupan por sus 16 bits altos en bloques de 65536. Cada
+# bloque es un "contenedor": si tiene pocos ids (<= 4096) es un arreglo
+# ordenado array('H') de 2 bytes por id; si tiene muchos, un Bitset de
+# 8 KB fijos. Asi las categorias chicas ocupan poco y las grandes no
+# pagan mas de 1 bit por libro. Union, interseccion y diferencia se
+# hacen contenedor por contenedor y solo en los bloques en comun.
+# ======================================================================
+
+class RoaringBitmap:
+    LIMITE_ARREGLO = 4096
+
+# Funcion: __init__
+    def __init__(self, ids=()):
+        # contenedores: bits altos -> array('H') ordenado o Bitset
+        self.contenedores: Dict[int, Any] = {}
+        for i in ids:
+            self.add(i)
+
+# Funcion: _ajustar
+    @staticmethod
+    def _ajustar(cont):
+        # Elige la representacion mas compacta para el contenedor
+        if isinstance(cont, Bitset):
+            if len(cont) <= RoaringBitmap.LIMITE_ARREGLO:
+                return array("H", cont)
+        elif len(cont) > RoaringBitmap.LIMITE_ARREGLO:
+            return Bitset(cont)
+        return cont
+
+# Funcion: add
+    def add(self, i: int):
+        alto, bajo = i >> 16, i & 0xFFFF
+        cont = self.contenedores.get(alto)
+        if cont is None:
+            self.contenedores[alto] = array("H", [bajo])
+        elif isinstance(cont, Bitset):
+            cont.add(bajo)
+        else:
+            pos = lower_bound(cont, bajo)
+            if pos == len(cont) or cont[pos] != bajo:
+                cont.insert(pos, bajo)
+                if len(cont) > RoaringBitmap.LIMITE_ARREGLO:
+                    self.contenedores[alto] = Bitset(cont)
+
+# Funcion: discard
+    def discard(self, i: int):
+        alto, bajo = i >> 16, i & 0xFFFF
+        cont = self.contenedores.get(alto)
+        if cont is None:
+            return
+        if isinstance(cont, Bitset):
+            cont.discard(bajo)
+        else:
+            pos = lower_bound(cont, bajo)
+            if pos < len(cont) and cont[pos] == bajo:
+                del cont[pos]
+        if not len(cont):
+            del self.contenedores[alto]
+        else:
+            self.contenedores[alto] = self._ajustar(cont)
+
+# Funcion: __contains__
+    def __contains__(self, i: int) -> bool:
+        cont = self.contenedores.get(i >> 16)
+        if cont is None:
+            return False
+        bajo = i & 0xFFFF
+        if isinstance(cont, Bitset):
+            return bajo in cont
+        pos = lower_bound(cont, bajo)
+        return pos < len(cont) and cont[pos] == bajo
+
+# Funcion: __len__
+    def __len__(self):
+        return sum(len(c) for c in self.contenedores.values())
+
+# Funcion: __iter__
+    def __iter__(self):
+        # Ids en orden creciente
+        for alto in sorted(self.contenedores):
+            base = alto << 16
+            for bajo in self.contenedores[alto]:
+                yield base | bajo
+
+# Funcion: memoria_bytes
+    def memoria_bytes(self) -> int:
+        # Bytes de datos de los contenedores (sin el diccionario)
+        total = 0
+        for c in self.contenedores.values():
+            total += len(c.palabras) * 8 if isinstance(c, Bitset) else len(c) * 2
+        return total
+
+# Funcion: _operar
+    @staticmethod
+    def _operar(a, b, op: str):
+        # Operacion entre dos contenedores del mismo bloque
+        if isinstance(a, Bitset) and isinstance(b, Bitset):
+            res = a & b if op == "&" else a | b if op == "|" else a - b
+        elif op == "&":
+            # Recorrer el arreglo (el mas chico) y probar en el otro
+            chico, grande = (a, b) if not isinstance(a, Bitset) else (b, a)
+            if isinstance(grande, Bitset):
+                res = array("H", (x for x in chico if x in grande))
+            else:
+                res = array("H", sorted(set(chico).intersection(grande)))
+        elif op == "|":
+            if isinstance(a, Bitset) or isinstance(b, Bitset):
+                # Copiar el bitmap y agregarle los ids del arreglo
+                base, otro = (a, b) if isinstance(a, Bitset) else (b, a)
+                res = Bitset.from_int(base.to_int())
+                for x in otro:
+                    res.add(x)
+            else:
+                res = array("H", sorted(set(a).union(b)))
+        else:
+            if isinstance(a, Bitset):
+                res = Bitset.from_int(a.to_int())
+                for x in b:
+                    res.discard(x)
+            else:
+                res = array("H", (x for x in a if x not in b)) if isinstance(b, Bitset) \
+                    else array("H", sorted(set(a).difference(b)))
+        return RoaringBitmap._ajustar(res) if len(res) else None
+
+# Funcion: _combinar
+    def _combinar(self, otro: 'RoaringBitmap', op: str) -> 'RoaringBitmap':
+        res = RoaringBitmap()
+        if op == "&":
+            bloques = self.contenedores.keys() & otro.contenedores.keys()
+        elif op == "|":
+            bloques = self.contenedores.keys() | otro.contenedores.keys()
+        else:
+            bloques = self.contenedores.keys()
+        for alto in bloques:
+            a = self.contenedores.get(alto)
+            b = otro.contenedores.get(alto)
+            if a is None or b is None:
+                # Solo esta en un lado (union o diferencia): se copia
+                cont = a if a is not None else b
+                c = Bitset.from_int(cont.to_int()) if isinstance(cont, Bitset) else array("H", cont)
+            else:
+                c = self._operar(a, b, op)
+            if c is not None:
+                res.contenedores[alto] = c
+        return res
+
+# Funcion: __and__
+    def __and__(self, otro: 'RoaringBitmap') -> 'RoaringBitmap':
+        return self._combinar(otro, "&")
+
+# Funcion: __or__
+    def __or__(self, otro: 'RoaringBitmap') -> 'RoaringBitmap':
+        return self._combinar(otro, "|")
+
+# Funcion: __sub__
+    def __sub__(self, otro: 'RoaringBitmap') -> 'RoaringBitmap':
+        return self._combinar(otro, "-")
+
+
+# ======================================================================
+#region MOTOR DE CONSULTAS
+# ======================================================================
+# Una consulta es una lista de filtros. Cada filtro sabe estimar cuantos
+# libros deja pasar, generar sus candidatos desde un indice y responder
+# si un id lo cumple. El plan arranca por el filtro mas selectivo (el
+# de menor estimacion), y los demas, del mas chico al mas grande, solo
+# verifican a esos candidatos. Si ningun filtro tiene indice se recorre
+# el catalogo completo.
+# ======================================================================
+
+@dataclass
+class FiltroConsulta:
+    descripcion: str                 # texto para el plan (explain)
+    estimacion: int                  # cantidad aproximada de ids que pasan
+    contiene: Any                    # contiene(book_id) -> bool
+    candidatos: Any = None           # candidatos() -> ids; None = sin indice
+
+
+# Funcion: ejecutar_plan
+def ejecutar_plan(filtros: List[FiltroConsulta], todos_ids) -> Tuple[List[int], List[str]]:
+    # Devuelve (ids que cumplen todos los filtros, lineas del plan)
+    con_indice = ordenar([f for f in filtros if f.candidatos is not None], key=lambda f: f.estimacion)
+    sin_indice = [f for f in filtros if f.candidatos is None]
+    plan = []
+    if con_indice:
+        base = con_indice[0]
+        plan.append(f"1. candidatos desde {base.descripcion} (~{base.estimacion})")
+        ids = list(base.candidatos())
+        resto = con_indice[1:] + sin_indice
+    else:
+        plan.append(f"1. recorrido completo del catalogo ({len(todos_ids)} libros)")
+        ids = list(todos_ids)
+        resto = sin_indice
+    for paso, f in enumerate(resto, start=2):
+        tipo = f"~{f.estimacion}" if f.candidatos is not None else "sin indice"
+        plan.append(f"{paso}. filtrar por {f.descripcion} ({tipo}): {len(ids)} candidatos")
+        ids = [i for i in ids if f.contiene(i)]
+        if not ids:
+            break
+    plan.append(f"=> {len(ids)} resultados")
+    return ids, plan
+
+
+# ======================================================================
+#region ALMACEN COLUMNAR
+# ======================================================================
+# Ademas de los objetos Book, el catalogo se guarda por columnas: un
+# arreglo por campo, todos alineados por fila. Titulos, autores y
+# conjuntos de categorias se guardan una sola vez en una tabla y las
+# columnas solo tienen su id entero. Asi contar o filtrar recorre
+# arreglos compactos (con NumPy si esta instalado) en vez de miles de
+# objetos. BookView es una vista liviana de una fila para quien
+# necesite leer un libro sin crear un Book nuevo.
+# ======================================================================
+
+class BookView:
+    # Solo guarda el almacen y el id; cada campo se lee de las columnas
+    __slots__ = ("_almacen", "book_id")
+
+# Funcion: __init__
+    def __init__(self, almacen: 'ColumnarCatalog', book_id: int):
+        self._almacen = almacen
+        self.book_id = book_id
+
+    @property
+    def title(self) -> str:
+        a = self._almacen
+        return a.titulos[a.titulo_ids[a._fila[self.book_id]]]
+
+    @property
+    def author(self) -> str:
+        a = self._almacen
+        return a.autores[a.autor_ids[a._fila[self.book_id]]]
+
+    @property
+    def isbn(self) -> str:
+        a = self._almacen
+        return a.isbns[a._fila[self.book_id]]
+
+    @property
+    def available(self) -> bool:
+        a = self._almacen
+        return bool(a.disponible[a._fila[self.book_id]])
+
+    @property
+    def categories(self) -> List[Tuple[str, ...]]:
+        a = self._almacen
+        return [a.categorias[c] for c in a.combos[a.combo_ids[a._fila[self.book_id]]]]
+
+# Funcion: __str__
+    def __str__(self):
+        # Mismo formato que Book.__str__
+        status = "Disponible" if self.available else "Prestado"
+        return f"{self.title} by {self.author} (ISBN:{self.isbn}) - {status}"
+
+# Funcion: __repr__
+    def __repr__(self):
+        return f"BookView(book_id={self.book_id}, title={self.title!r})"
+
+
+class ColumnarCatalog:
+    # Campos que se pueden pedir en export()
+    CAMPOS = ("book_id", "title", "author", "isbn", "available", "categories")
+
+# Funcion: __init__
+    def __init__(self):
+        # Tablas de valores distintos (valor <-> id)
+        self.titulos: List[str] = []
+        self._titulo_id: Dict[str, int] = {}
+        self.autores: List[str] = []
+        self._autor_id: Dict[str, int] = {}
+        self.categorias: List[Tuple[str, ...]] = []
+        self._categoria_id: Dict[Tuple[str, ...], int] = {}
+        # Cada libro puede estar en varias categorias: se guarda el id del
+        # conjunto (ordenado) de ids de categoria; el conjunto vacio es 0
+        self.combos: List[Tuple[int, ...]] = [()]
+        self._combo_id: Dict[Tuple[int, ...], int] = {(): 0}
+        # Columnas (misma fila = mismo libro)
+        self.book_ids = array('I')
+        self.titulo_ids = array('I')
+        self.autor_ids = array('I')
+        self.isbns: List[str] = []
+        self.disponible = array('B')
+        self.combo_ids = array('I')
+        # book_id -> fila
+        self._fila: Dict[int, int] = {}
+
+# Funcion: _internar
+    @staticmethod
+    def _internar(tabla: list, ids: dict, valor) -> int:
+        # Devuelve el id del valor en la tabla, agregandolo si es nuevo
+        i = ids.get(valor)
+        if i is None:
+            i = ids[valor] = len(tabla)
+            tabla.append(valor)
+        return i
+
+# Funcion: add
+    def add(self, book: Book):
+        # Agrega una fila al final de todas las columnas
+        self._fila[book.book_id] = len(self.book_ids)
+        self.book_ids.append(book.book_id)
+        self.titulo_ids.append(self._internar(self.titulos, self._titulo_id, book.title))
+        self.autor_ids.append(self._internar(self.autores, self._autor_id, book.author))
+        self.isbns.append(book.isbn)
+        self.disponible.append(1 if book.available else 0)
+        self.combo_ids.append(0)
+
+# Funcion: remove
+    def remove(self, book_id: int) -> bool:
+        # Borra la fila en O(1) moviendo la ultima fila a su lugar (el orden
+        # de las filas no importa)
+        fila = self._fila.pop(book_id, None)
+        if fila is None:
+            return False
+        ultima = len(self.book_ids) - 1
+        for col in (self.book_ids, self.titulo_ids, self.autor_ids,
+                    self.isbns, self.disponible, self.combo_ids):
+            col[fila] = col[ultima]
+            col.pop()
+        if fila != ultima:
+            self._fila[self.book_ids[fila]] = fila
+        return True
+
+# Funcion: set_available
+    def set_available(self, book_id: int, disponible: bool):
+        self.disponible[self._fila[book_id]] = 1 if disponible else 0
+
+# Funcion: add_category
+    def add_category(self, book_id: int, category_path: List[str]):
+        # Suma la categoria al conjunto de categorias del libro
+        fila = self._fila[book_id]
+        cat = self._internar(self.categorias, self._categoria_id, tuple(category_path))
+        actual = self.combos[self.combo_ids[fila]]
+        if cat not in actual:
+            nuevo = tuple(sorted(actual + (cat,)))
+            self.combo_ids[fila] = self._internar(self.combos, self._combo_id, nuevo)
+
+# Funcion: remove_book_category
+    def remove_book_category(self, book_id: int, category_path: List[str]):
+        # Inversa de add_category para un solo libro
+        fila = self._fila[book_id]
+        cat = self._categoria_id.get(tuple(category_path))
+        actual = self.combos[self.combo_ids[fila]]
+        if cat in actual:
+            resto = tuple(c for c in actual if c != cat)
+            self.combo_ids[fila] = self._internar(self.combos, self._combo_id, resto)
+
+# Funcion: remove_category
+    def remove_category(self, category_path: List[str]):
+        # Quita la categoria y sus subcategorias del conjunto de categorias
+        # de cada libro. Se calcula el conjunto nuevo una vez por conjunto
+        # afectado y luego se reemplaza en las filas que lo usaban
+        prefijo = tuple(category_path)
+        cats = {i for i, path in enumerate(self.categorias) if path[:len(prefijo)] == prefijo}
+        if not cats:
+            return
+        reemplazo: Dict[int, int] = {}
+        for i, combo in enumerate(list(self.combos)):
+            if any(c in cats for c in combo):
+                resto = tuple(c for c in combo if c not in cats)
+                reemplazo[i] = self._internar(self.combos, self._combo_id, resto)
+        for fila, combo_id in enumerate(self.combo_ids):
+            if combo_id in reemplazo:
+                self.combo_ids[fila] = reemplazo[combo_id]
+
+# Funcion: rebuild
+    def rebuild(self, books, categorias: TreeNode):
+        # Reconstruye todas las columnas (al cargar datos); tambien
+        # descarta de las tablas los valores que ya nadie usa
+        self.__init__()
+        for b in books:
+            self.add(b)
+        pendientes = [(categorias, (categorias.name,))]
+        while pendientes:
+            nodo, path = pendientes.pop()
+            for book_id in nodo.miembros:
+                if book_id in self._fila:
+                    self.add_category(book_id, path)
+            pendientes.extend((h, path + (h.name,)) for h in nodo.children)
+
+# Funcion: __len__
+    def __len__(self):
+        return len(self.book_ids)
+
+# Funcion: view
+    def view(self, book_id: int) -> Optional[BookView]:
+        return BookView(self, book_id) if book_id in self._fila else None
+
+# Funcion: _combos_de_categoria
+    def _combos_de_categoria(self, category_path: List[str]) -> set:
+        # Ids de conjunto que incluyen la categoria o alguna subcategoria
+        prefijo = tuple(category_path)
+        cats = {i for i, path in enumerate(self.categorias) if path[:len(prefijo)] == prefijo}
+        return {i for i, combo in enumerate(self.combos) if any(c in cats for c in combo)}
+
+# Funcion: _filas
+    def _filas(self, available: Optional[bool], author: Optional[str],
+               category: Optional[List[str]]):
+        # Filas que cumplen todos los filtros dados (None = sin filtro).
+        # El autor se compara exacto, como quedo guardado
+        n = len(self.book_ids)
+        autor_id = combos = None
+        if author is not None:
+            autor_id = self._autor_id.get(author)
+            if autor_id is None:
+                return []
+        if category is not None:
+            combos = self._combos_de_categoria(category)
+            if not combos:
+                return []
+        if np is not None:
+            # Mascara booleana sobre las columnas, sin copiarlas
+            mascara = np.ones(n, dtype=bool)
+            if available is not None:
+                mascara &= np.frombuffer(self.disponible, dtype=np.uint8) == int(available)
+            if autor_id is not None:
+                mascara &= np.frombuffer(self.autor_ids, dtype=np.uint32) == autor_id
+            if combos is not None:
+                mascara &= np.isin(np.frombuffer(self.combo_ids, dtype=np.uint32), list(combos))
+            return np.flatnonzero(mascara).tolist()
+        filas = range(n)
+        if available is not None:
+            objetivo = int(available)
+            filas = [i for i in filas if self.disponible[i] == objetivo]
+        if autor_id is not None:
+            filas = [i for i in filas if self.autor_ids[i] == autor_id]
+        if combos is not None:
+            filas = [i for i in filas if self.combo_ids[i] in combos]
+        return filas
+
+# Funcion: count
+    def count(self, available: Optional[bool] = None, author: Optional[str] = None,
+              category: Optional[List[str]] = None) -> int:
+        if available is None and author is None and category is None:
+            return len(self.book_ids)
+        return len(self._filas(available, author, category))
+
+# Funcion: filter
+    def filter(self, available: Optional[bool] = None, author: Optional[str] = None,
+               category: Optional[List[str]] = None) -> List[BookView]:
+        # Libros que cumplen los filtros, como vistas de fila
+        return [BookView(self, self.book_ids[i]) for i in self._filas(available, author, category)]
+
+# Funcion: count_by_author
+    def count_by_author(self) -> Dict[str, int]:
+        # Cantidad de libros por autor contando sobre la columna de ids
+        if np is not None and len(self.autor_ids):
+            conteo = np.bincount(np.frombuffer(self.autor_ids, dtype=np.uint32))
+            return {self.autores[i]: int(c) for i, c in enumerate(conteo) if c}
+        return {self.autores[i]: c for i, c in Counter(self.autor_ids).items()}
+
+# Funcion: export
+    def export(self, campos=("book_id", "title", "author", "isbn", "available")):
+        # Genera una tupla por libro con los campos pedidos, leyendo las
+        # columnas fila a fila (no arma la tabla completa en memoria)
+        for c in campos:
+            if c not in self.CAMPOS:
+                raise ValueError(f"Campo desconocido: {c}")
+        for fila in range(len(self.book_ids)):
+            yield tuple(self._valor(fila, c) for c in campos)
+
+# Funcion: _valor
+    def _valor(self, fila: int, campo: str):
+        if campo == "book_id":
+            return self.book_ids[fila]
+        if campo == "title":
+            return self.titulos[self.titulo_ids[fila]]
+        if campo == "author":
+            return self.autores[self.autor_ids[fila]]
+        if campo == "isbn":
+            return self.isbns[fila]
+        if campo == "available":
+            return bool(self.disponible[fila])
+        return ["/".join(self.categorias[c]) for c in self.combos[self.combo_ids[fila]]]
+
+
+# ======================================================================
+#region IMPORTACION MASIVA
+# ======================================================================
+# Carga de catalogos grandes desde CSV o JSON Lines (archivo o stdin).
+# Las filas se leen de a una (generador), se juntan en lotes y cada
+# lote se indexa de una vez con Biblioteca._indexar_lote: los arreglos
+# ordenados se mezclan una vez por lote en lugar de insertar libro por
+# libro. En memoria solo vive el lote actual, asi el consumo no depende
+# del tamaño del archivo (mas alla de los libros ya cargados).
+# ======================================================================
+
+# Nombres de columna aceptados (en ingles o castellano)
+CAMPOS_IMPORTACION = {
+    "title": "title", "titulo": "title", "título": "title",
+    "author": "author", "autor": "author",
+    "isbn": "isbn",
+    "available": "available", "disponible": "available",
+}
+VALORES_FALSOS = {"0", "false", "no", "prestado", "n"}
+
+
+@dataclass
+class ImportReport:
+    # Resultado de una importacion masiva
+    leidos: int = 0
+    agregados: int = 0
+    duplicados: int = 0
+    invalidos: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+    # Algunos ISBN repetidos de ejemplo (no todos, para no crecer sin fin)
+    ejemplos_duplicados: List[str] = field(default_factory=list)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.leidos / self.segundos if self.segundos else 0.0
+
+# Funcion: __str__
+    def __str__(self):
+        return (f"{self.agregados} agregados, {self.duplicados} ISBN duplicados y "
+                f"{self.invalidos} filas inválidas de {self.leidos} leídas en "
+                f"{self.segundos:.2f} s ({self.filas_por_segundo:,.0f} filas/s, {self.lotes} lotes)")
+
+# Funcion: formato_de
+def formato_de(ruta: str) -> str:
+    # Deduce el formato por la extension del archivo
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"No se reconoce el formato de {ruta!r}; indique 'csv' o 'jsonl'")
+
+# Funcion: leer_filas
+def leer_filas(archivo, formato: str):
+    # Genera un dict por fila; None si la fila no se pudo leer
+    if formato == "csv":
+        yield from csv.DictReader(archivo)
+    elif formato == "jsonl":
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                fila = json.loads(linea)
+            except ValueError:
+                yield None
+                continue
+            yield fila if isinstance(fila, dict) else None
+    else:
+        raise ValueError(f"Formato de importacion desconocido: {formato}")
+
+# Funcion: fila_a_libro
+def fila_a_libro(fila) -> Optional[Tuple[str, str, str, bool]]:
+    # (titulo, autor, isbn, disponible) o None si falta algun dato
+    if not fila:
+        return None
+    datos = {}
+    for clave, valor in fila.items():
+        campo = CAMPOS_IMPORTACION.get(str(clave).strip().lower())
+        if campo:
+            datos[campo] = valor
+    title, author, isbn = (str(datos.get(c) or "").strip() for c in ("title", "author", "isbn"))
+    if not (title and author and isbn):
+        return None
+    disponible = datos.get("available", True)
+    if isinstance(disponible, str):
+        disponible = disponible.strip().lower() not in VALORES_FALSOS
+    return title, author, isbn, bool(disponible)
+
+
+# ======================================================================
+#region EXPORTACION MASIVA
+# ======================================================================
+# Salida de los datos sin tener que abrir el pickle: cada seccion
+# (libros, usuarios, prestamos pendientes, categorias y relaciones) se
+# genera fila a fila con un generador y se escribe por bloques en CSV,
+# JSON Lines o lista de aristas. Nunca hay mas de un bloque de filas en
+# memoria, asi el consumo no depende del tamaño de la exportacion. El
+# CSV de libros usa las mismas columnas que acepta la importacion.
+# ======================================================================
 
-# Funcion: show
-    def show(self):
-        # Muestra el grafo: para cada libro imprime su lista de relacionados
-        for k, vs in self.adj.items():
-            print(f"{k}: {vs}")
+SECCIONES_EXPORTACION = ("libros", "usuarios", "prestamos", "categorias", "relaciones")
+FORMATOS_EXPORTACION = {
+    ".csv": "csv",
+    ".jsonl": "jsonl", ".ndjson": "jsonl",
+    ".edges": "aristas", ".edgelist": "aristas",
+}
 
-# Funcion: related_by_two_steps
-    def related_by_two_steps(self, title: str) -> List[str]:
-        # Ejemplo de operacion en grafo: encontrar libros a distancia 2
-        # Esto sirve para sugerir "amigos de amigos" (libros relacionados por via intermedia)
-        res = set()
-        direct = set(self.neighbors(title))
-        for nb in direct:
-            for nb2 in self.neighbors(nb):
-                if nb2 != title and nb2 not in direct:
-                    res.add(nb2)
-        return list(res)
+# Funcion: escribir_filas
+def escribir_filas(archivo, columnas: Tuple[str, ...], filas, formato: str,
+                   bloque: int = 10_000) -> int:
+    # Escribe las filas (tuplas) de a 'bloque'; devuelve cuantas escribio.
+    # El formato de aristas es una linea "a<TAB>b" por relacion
+    if formato == "csv":
+        escritor = csv.writer(archivo)
+        escritor.writerow(columnas)
+    elif formato == "jsonl":
+        formatear = lambda f: json.dumps(dict(zip(columnas, f)), ensure_ascii=False) + "\n"
+    elif formato == "aristas":
+        if len(columnas) != 2:
+            raise ValueError("La lista de aristas solo sirve para secciones de dos columnas")
+        formatear = lambda f: f"{f[0]}\t{f[1]}\n"
+    else:
+        raise ValueError(f"Formato de exportacion desconocido: {formato}")
+    total = 0
+    filas = iter(filas)
+    while True:
+        trozo = list(islice(filas, bloque))
+        if not trozo:
+            return total
+        if formato == "csv":
+            escritor.writerows(trozo)
+        else:
+            archivo.write("".join(map(formatear, trozo)))
+        total += len(trozo)
 
 
 # ======================================================================
-#region ALGORITMOS: BURBUJA, BUSQUEDAS
+#region PERSISTENCIA DURABLE
 # ======================================================================
-# Implementaciones basicas y explicadas de los algoritmos solicitados.
-# Burbuja: sencillo de implementar, suficiente para volumenes pequenos.
-# Busqueda secuencial: para listas no ordenadas.
-# Busqueda binaria: para listas ya ordenadas (mejor rendimiento).
+# Un guardado no debe dejar el archivo a medio escribir si el programa
+# se corta: se escribe primero un archivo temporal, se fuerza a disco
+# (fsync) y recien entonces se reemplaza el original con os.replace,
+# que es atomico. Quien lee ve el archivo viejo o el nuevo, nunca uno
+# mezclado.
 # ======================================================================
 
-# Funcion: bubble_sort
-def bubble_sort(items: List[Any], key=lambda x: x) -> List[Any]:
-    # Ordena una copia de 'items' usando el criterio 'key'
-    # Devuelve la lista ordenada (no modifica la original)
-    arr = items[:]
-    n = len(arr)
-    for i in range(n):
-        swapped = False
-        for j in range(0, n - i - 1):
-            if key(arr[j]) > key(arr[j + 1]):
-                arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                swapped = True
-        if not swapped:
-            # Si en una pasada no se intercambió nada, ya esta ordenado
-            break
-    return arr
+# Funcion: escribir_atomico
+def escribir_atomico(archivo: str, contenido: bytes):
+    temporal = archivo + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(contenido)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, archivo)
 
+# Cada seccion se guarda en su propio archivo con un numero de
+# generacion en el nombre (biblioteca_data.usuarios.7.pkl). El archivo
+# principal pasa a ser un manifiesto que dice que generacion de cada
+# seccion forma el estado guardado. Una seccion nueva se escribe con
+# otro nombre y solo despues se reemplaza el manifiesto, asi un corte
+# a mitad de guardado deja el manifiesto anterior, que sigue apuntando
+# a archivos completos y consistentes entre si. El registro de la cola
+# de prestamos tambien tiene generacion y el manifiesto dice cual va con
+# las secciones guardadas (clave "cola").
+SECCIONES_DATOS = ("libros", "usuarios", "historial", "categorias", "relaciones")
+FORMATO_MANIFIESTO = 2
 
-# Funcion: sequential_search
-def sequential_search(items: List[Any], predicate):
-    # Recorre 'items' y devuelve el primer elemento que cumpla predicate
-    for item in items:
-        if predicate(item):
-            return item
+# Funcion: leer_manifiesto
+def leer_manifiesto(archivo: str) -> Optional[Dict[str, Any]]:
+    # El manifiesto guardado en 'archivo', o None si no existe o si el
+    # archivo es un guardado completo de versiones anteriores
+    if not os.path.exists(archivo):
+        return None
+    with open(archivo, "rb") as f:
+        datos = pickle.load(f)
+    if isinstance(datos, dict) and datos.get("formato") == FORMATO_MANIFIESTO:
+        return datos
     return None
 
-
-# Funcion: binary_search
-def binary_search(sorted_items: List[Any], target, key=lambda x: x):
-    # Busqueda binaria en lista ya ordenada segun 'key'
-    lo, hi = 0, len(sorted_items) - 1
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        mid_val = key(sorted_items[mid])
-        if mid_val == target:
-            return sorted_items[mid]
-        elif mid_val < target:
-            lo = mid + 1
-        else:
-            hi = mid - 1
-    return None
+# Funcion: archivo_de_seccion
+def archivo_de_seccion(archivo: str, seccion: str, generacion: int) -> str:
+    # biblioteca_data.pkl -> biblioteca_data.libros.3.pkl (misma carpeta)
+    base, ext = os.path.splitext(archivo)
+    return f"{base}.{seccion}.{generacion}{ext or '.pkl'}"
 
 
 # ======================================================================
-#region MODELOS DE DATOS
+#region REGISTRO DE LA COLA DE PRESTAMOS
 # ======================================================================
-# Definicion de clases simples para Book y User. Son dataclasses para
-# mayor claridad y menos codigo repetido.
+# Las solicitudes pendientes no van en el pickle: cada alta y cada baja
+# de la cola se agrega como una linea JSON corta a un archivo propio y
+# se fuerza a disco (fsync), sin reescribir nada mas. Una alta es
+# ["E", usuario, isbn, marca_de_tiempo] y una baja (siempre la primera
+# de la cola) es ["D"], o ["D", isbn] si se presto el libro. Las
+# devoluciones son ["R", isbn, ...]. Asi el resultado de un prestamo o
+# una devolucion no depende del guardado al salir: al cargar se vuelve
+# a aplicar sobre los libros del ultimo guardado. Al guardar, esos
+# cambios pasan al pickle: se escribe un registro nuevo (otra generacion,
+# solo con las pendientes) antes del manifiesto, y el manifiesto nuevo lo
+# apunta. Asi libros y cola se confirman juntos, con un solo reemplazo.
+# Para que cargar siga siendo O(pendientes), el archivo se compacta (se
+# reescribe con las pendientes y el ultimo estado de cada libro que
+# cambio, como ["P", isbn] o ["R", isbn]) cuando las lineas superan el
+# doble de lo que hay que conservar.
 # ======================================================================
 
-@dataclass
-class Book:
-    title: str
-    author: str
-    isbn: str
-    available: bool = True  # True si el libro esta disponible
+# Funcion: ruta_cola
+def ruta_cola(archivo_datos: str, generacion: Optional[int] = None) -> str:
+    # biblioteca_data.pkl -> biblioteca_data_cola.3.log (sin generacion,
+    # biblioteca_data_cola.log: el de manifiestos que no tenian "cola")
+    base = os.path.splitext(archivo_datos)[0]
+    if generacion is None:
+        return base + "_cola.log"
+    return f"{base}_cola.{generacion}.log"
 
-# Funcion: __str__
-    def __str__(self):
-        # Representacion legible del libro para imprimir en consola
-        status = "Disponible" if self.available else "Prestado"
-        return f"{self.title} by {self.author} (ISBN:{self.isbn}) - {status}"
 
+class LoanQueueLog:
+    # Lineas de sobra que se toleran antes de compactar
+    HOLGURA = 1024
 
-@dataclass
-class User:
-    user_id: str
-    name: str
+# Funcion: __init__
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self.lineas = 0        # Lineas validas en el archivo
+        self.pendientes = 0    # Solicitudes que siguen en la cola
+        self._cortado = False  # La ultima linea quedo incompleta
+        # (isbn, disponible) de prestamos y devoluciones que todavia no
+        # estan en el pickle, en orden
+        self.cambios: List[Tuple[str, bool]] = []
 
-# Funcion: __str__
-    def __str__(self):
-        return f"{self.user_id} - {self.name}"
+# Funcion: cargar
+    def cargar(self) -> List[Tuple[str, str, float]]:
+        # Reproduce el archivo y devuelve las solicitudes pendientes en
+        # orden: (usuario, isbn, marca de tiempo). Los prestamos y
+        # devoluciones quedan en 'cambios'
+        cola: List[Tuple[str, str, float]] = []
+        inicio = 0
+        if os.path.exists(self.archivo):
+            with open(self.archivo, encoding="utf-8") as f:
+                for linea in f:
+                    if not linea.endswith("\n"):
+                        # Un corte durante la escritura deja media linea
+                        self._cortado = True
+                        break
+                    rec = json.loads(linea)
+                    self.lineas += 1
+                    if rec[0] == "E":
+                        cola.append((rec[1], rec[2], rec[3]))
+                    elif rec[0] == "D":
+                        if inicio < len(cola):
+                            inicio += 1
+                        self.cambios.extend((isbn, False) for isbn in rec[1:])
+                    elif rec[0] == "P":
+                        self.cambios.extend((isbn, False) for isbn in rec[1:])
+                    elif rec[0] == "R":
+                        self.cambios.extend((isbn, True) for isbn in rec[1:])
+        pendientes = cola[inicio:]
+        self.pendientes = len(pendientes)
+        return pendientes
+
+# Funcion: alta
+    def alta(self, user_id: str, isbn: str, marca: float):
+        self._agregar(["E", user_id, isbn, marca])
+        self.pendientes += 1
+
+# Funcion: baja
+    def baja(self, prestado: Optional[str] = None):
+        # 'prestado' es el isbn del libro que se presto, si se presto
+        if prestado is None:
+            self._agregar(["D"])
+        else:
+            self._agregar(["D", prestado])
+            self.cambios.append((prestado, False))
+        self.pendientes -= 1
+
+# Funcion: devolucion
+    def devolucion(self, isbns: List[str]):
+        self._agregar(["R", *isbns])
+        self.cambios.extend((isbn, True) for isbn in isbns)
+
+# Funcion: conviene_compactar
+    def conviene_compactar(self) -> bool:
+        return self._cortado or self.lineas > 2 * (self.pendientes + len(self.cambios)) + self.HOLGURA
+
+# Funcion: reescribir
+    def reescribir(self, registros):
+        # Deja en el archivo el ultimo estado de cada libro de 'cambios' y
+        # las altas de 'registros' (atomico)
+        estado = dict(self.cambios)
+        self.cambios = list(estado.items())
+        lineas = [self._linea(["R" if disponible else "P", isbn]) for isbn, disponible in self.cambios]
+        altas = [self._linea(["E", u, isbn, marca]) for u, isbn, marca in registros]
+        escribir_atomico(self.archivo, "".join(lineas + altas).encode("utf-8"))
+        self.lineas = len(lineas) + len(altas)
+        self.pendientes = len(altas)
+        self._cortado = False
+
+# Funcion: _linea
+    @staticmethod
+    def _linea(rec) -> str:
+        return json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+# Funcion: _agregar
+    def _agregar(self, rec):
+        with open(self.archivo, "a", encoding="utf-8") as f:
+            f.write(self._linea(rec))
+            f.flush()
+            os.fsync(f.fileno())
+        self.lineas += 1
 
 
 # ======================================================================
@@ -417,42 +2953,250 @@ class User:
 
 class Biblioteca:
 # Funcion: __init__
-    def __init__(self):
+    def __init__(self, catalogo_ordenado=False):
         # Inicializacion de todas las estructuras usadas por el sistema
-        self.books = LinkedList()        # Almacen principal de Book
-        self.users = LinkedList()        # Almacen de User
-        self.loan_queue = Queue()        # Cola para solicitudes de prestamo
+        # Con catalogo_ordenado=True los libros se guardan en una SkipList
+        # por titulo en vez de una LinkedList: siempre quedan ordenados
+        self.catalogo_ordenado = catalogo_ordenado
+        self.books = self._nuevo_almacen()  # Almacen principal de Book
+        self.users = UnrolledLinkedList()  # Almacen de User
+        self.loan_queue = Queue()        # Cola de (usuario, id de libro, marca de tiempo)
+        self.registro_cola: Optional[LoanQueueLog] = None  # Copia en disco de la cola
         self.history = Stack()           # Pila para historial de acciones
         self.categories = TreeNode("Biblioteca")  # Raiz del arbol de categorias
         self.relations = Graph()         # Grafo de relaciones entre libros
+        # Ids enteros estables: el grafo, el arbol y la cola usan el id del
+        # libro como clave; el titulo solo se busca al mostrar
+        self._next_id = 1
+        self._libros_por_id: Dict[int, Book] = {}
+        self._libros_por_isbn: Dict[str, Book] = {}
+        # Tabla de internado: titulos, autores e ids de usuario se guardan
+        # una sola vez y todos los registros apuntan a esa copia. '_usos'
+        # cuenta referencias para soltar las cadenas que ya nadie usa
+        self._cadenas: Dict[str, str] = {}
+        self._usos: Counter = Counter()
+        self._bytes_ahorrados = 0
+        # Indice de titulos normalizados (sin mayusculas ni acentos)
+        self.indice_titulos = NormalizedIndex(lambda b: b.title)
+        # Indice invertido de palabras de titulo y autor (ranking BM25)
+        self.indice_texto = InvertedIndex()
+        # Indice de autores normalizados: autor -> lista de sus libros
+        self.indice_autores = NormalizedIndex(lambda b: b.author)
+        # Bit por id de libro: 1 = disponible. Conteos y filtros de
+        # disponibilidad salen de aqui sin visitar cada Book
+        self.disponibles = Bitset()
+        # Trigramas de los titulos normalizados (busqueda con errores)
+        self.indice_trigramas = TrigramIndex(self.indice_titulos.clave_de)
+        # Arbol radix de titulos normalizados para autocompletar
+        self.indice_prefijos = RadixTree()
+        # Vistas ordenadas persistentes, mantenidas en cada alta/baja/cambio.
+        # Reutilizan la clave normalizada del indice de titulos, por eso el
+        # indice debe actualizarse antes que las vistas
+        titulo = self.indice_titulos.clave_de
+        autor = self.indice_autores.clave_de
+        self.vistas: Dict[str, SortedView] = {
+            "titulo": SortedView(lambda b: titulo(b.book_id)),
+            "autor": SortedView(lambda b: (autor(b.book_id), titulo(b.book_id))),
+            "isbn": SortedView(lambda b: b.isbn),
+            "disponibilidad": SortedView(lambda b: (not b.available, titulo(b.book_id))),
+        }
+        # Copia del catalogo por columnas para conteos y filtros masivos
+        self.columnas = ColumnarCatalog()
+        self._en_transaccion = False     # True dentro de lib.transaction()
+        # True si la cola en memoria tiene cambios que no estan en su
+        # registro (los de una transaccion confirmada): el proximo
+        # guardado escribe un registro nuevo
+        self._cola_sin_registrar = False
+        self._deshacer: List[Tuple[Any, tuple]] = []  # Acciones inversas de la transaccion
+        # Version de cada seccion: sube con cada cambio. '_guardado' tiene
+        # la version que quedo en disco, asi guardar_datos solo reescribe
+        # las secciones que cambiaron. El historial usa su propio contador
+        self._versiones: Dict[str, int] = dict.fromkeys(SECCIONES_DATOS, 0)
+        self._guardado: Dict[str, int] = {}
+        self._manifiesto: Optional[Dict[str, Any]] = None
+        self._archivo_guardado: Optional[str] = None
         self.cargar_datos()              # Cargar datos al iniciar
 
 # Funcion: guardar_datos
-    def guardar_datos(self, archivo="biblioteca_data.pkl"):
-        # Guarda libros, usuarios, historial, categorías y relaciones en un archivo usando pickle
-        datos = {
-            "libros": self.books.to_list(),
-            "usuarios": self.users.to_list(),
-            "historial": self.history.to_list(),
-            "categorias": self.categories,
-            "relaciones": self.relations,
+    def guardar_datos(self, archivo="biblioteca_data.pkl") -> List[str]:
+        # Guarda libros, usuarios, historial, categorías y relaciones con pickle,
+        # cada seccion en su archivo. Solo se reescriben las secciones que
+        # cambiaron desde el ultimo guardado en este mismo archivo; despues
+        # se reemplaza el manifiesto (atomico) y se borran las generaciones
+        # viejas. La cola va en el mismo manifiesto: ver _guardar_cola.
+        # Devuelve las secciones que se escribieron
+        if archivo == self._archivo_guardado:
+            anterior, todas = self._manifiesto, False
+        else:
+            # Otro archivo (o datos de una version anterior): se escribe
+            # todo, continuando la numeracion si ya habia un manifiesto
+            anterior, todas = leer_manifiesto(archivo), True
+        secciones = dict(anterior["secciones"]) if anterior else {}
+        generaciones = dict(anterior["generaciones"]) if anterior else {}
+        escritas, viejos = [], []
+        for seccion in SECCIONES_DATOS:
+            if not todas and seccion in secciones and self._version(seccion) == self._guardado.get(seccion):
+                continue
+            generacion = generaciones.get(seccion, 0) + 1
+            nombre = archivo_de_seccion(archivo, seccion, generacion)
+            escribir_atomico(nombre, pickle.dumps(self._datos_de_seccion(seccion)))
+            if seccion in secciones:
+                viejos.append(secciones[seccion])
+            secciones[seccion] = os.path.basename(nombre)
+            generaciones[seccion] = generacion
+            escritas.append(seccion)
+        carpeta = os.path.dirname(archivo)
+        cola = anterior.get("cola") if anterior else None
+        registro_nuevo = self._guardar_cola(archivo, carpeta, cola, generaciones, todas)
+        if registro_nuevo is not None:
+            viejos.append(cola if cola else os.path.basename(ruta_cola(archivo)))
+            cola = os.path.basename(registro_nuevo.archivo)
+        manifiesto = {
+            "formato": FORMATO_MANIFIESTO,
+            "siguiente_id": self._next_id,
+            "secciones": secciones,
+            "generaciones": generaciones,
+            "cola": cola,
         }
-        with open(archivo, "wb") as f:
-            pickle.dump(datos, f)
+        escribir_atomico(archivo, pickle.dumps(manifiesto))
+        for nombre in viejos:
+            try:
+                os.remove(os.path.join(carpeta, nombre))
+            except OSError:
+                pass
+        self._manifiesto, self._archivo_guardado = manifiesto, archivo
+        self._guardado = {s: self._version(s) for s in SECCIONES_DATOS}
+        if registro_nuevo is not None:
+            self.registro_cola = registro_nuevo
+            self._cola_sin_registrar = False
+        return escritas
+
+# Funcion: _guardar_cola
+    def _guardar_cola(self, archivo: str, carpeta: str, cola: Optional[str],
+                      generaciones: Dict[str, int], todas: bool) -> Optional[LoanQueueLog]:
+        # Parte de guardar_datos, antes de reemplazar el manifiesto. Si el
+        # registro actual no sirve para el estado que se guarda (tiene
+        # prestamos o devoluciones que ahora van en el pickle de libros,
+        # la cola cambio en una transaccion, o es de otro archivo) se
+        # escribe uno nuevo con otra generacion y solo las pendientes.
+        # Devuelve ese registro, o None si el manifiesto sigue apuntando
+        # al mismo
+        registro = self.registro_cola
+        actual = os.path.join(carpeta, cola) if cola else None
+        if (not todas and registro is not None and not registro.cambios
+                and not self._cola_sin_registrar and registro.archivo == actual):
+            return None
+        generacion = generaciones.get("cola", 0) + 1
+        nuevo = LoanQueueLog(ruta_cola(archivo, generacion))
+        nuevo.reescribir(self._registros_cola())
+        generaciones["cola"] = generacion
+        return nuevo
+
+# Funcion: _version
+    def _version(self, seccion: str) -> int:
+        if seccion == "historial":
+            return self.history.cambios
+        return self._versiones[seccion]
+
+# Funcion: _marcar
+    def _marcar(self, *secciones: str):
+        # Anota que estas secciones cambiaron y hay que volver a guardarlas
+        for seccion in secciones:
+            self._versiones[seccion] += 1
+
+# Funcion: _datos_de_seccion
+    def _datos_de_seccion(self, seccion: str):
+        if seccion == "libros":
+            return self.books.to_list()
+        if seccion == "usuarios":
+            return self.users.to_list()
+        if seccion == "historial":
+            return self.history.to_list()
+        if seccion == "categorias":
+            return self.categories
+        return self.relations
 
 # Funcion: cargar_datos
     def cargar_datos(self, archivo="biblioteca_data.pkl"):
         # Carga libros, usuarios, historial, categorías y relaciones desde un archivo pickle
-        if not os.path.exists(archivo):
-            return
-        with open(archivo, "rb") as f:
-            datos = pickle.load(f)
+        # Acepta el manifiesto con archivos por seccion o el archivo unico
+        # de versiones anteriores (que se reescribe completo al guardar)
+        archivo_cola = ruta_cola(archivo)
+        if os.path.exists(archivo):
+            manifiesto = leer_manifiesto(archivo)
+            if manifiesto is None:
+                with open(archivo, "rb") as f:
+                    datos = pickle.load(f)
+            else:
+                datos = {"siguiente_id": manifiesto["siguiente_id"]}
+                carpeta = os.path.dirname(archivo)
+                for seccion, nombre in manifiesto["secciones"].items():
+                    with open(os.path.join(carpeta, nombre), "rb") as f:
+                        datos[seccion] = pickle.load(f)
+            self._aplicar_datos(datos)
+            self._versiones = dict.fromkeys(SECCIONES_DATOS, 0)
+            if manifiesto is not None:
+                self._manifiesto, self._archivo_guardado = manifiesto, archivo
+                self._guardado = {s: self._version(s) for s in SECCIONES_DATOS}
+                if manifiesto.get("cola"):
+                    archivo_cola = os.path.join(os.path.dirname(archivo), manifiesto["cola"])
+        self._cargar_cola(archivo_cola)
+
+# Funcion: _cargar_cola
+    def _cargar_cola(self, archivo_cola: str):
+        # Rearma la cola desde su registro. Las solicitudes de libros o
+        # usuarios que ya no existen (por ejemplo, datos sin guardar) se
+        # descartan y el registro se compacta
+        self.registro_cola = LoanQueueLog(archivo_cola)
+        self._cola_sin_registrar = False
+        usuarios = {u.user_id: u for u in self.users}
+        self.loan_queue = Queue()
+        descartadas = 0
+        for user_id, isbn, marca in self.registro_cola.cargar():
+            book, user = self._libros_por_isbn.get(isbn), usuarios.get(user_id)
+            if book and user:
+                self.loan_queue.enqueue((user.user_id, book.book_id, marca))
+            else:
+                descartadas += 1
+        # Prestamos y devoluciones posteriores al ultimo guardado
+        cambios = self.registro_cola.cambios
+        self.registro_cola.cambios = []
+        for isbn, disponible in cambios:
+            book = self._libros_por_isbn.get(isbn)
+            if book is None:
+                descartadas += 1
+                continue
+            if book.available != disponible:
+                self._cambiar_disponibilidad(book, disponible)
+            self.registro_cola.cambios.append((isbn, disponible))
+        if descartadas or self.registro_cola.conviene_compactar():
+            self._reescribir_cola()
+
+# Funcion: _registros_cola
+    def _registros_cola(self):
+        # Solicitudes pendientes como las guarda el registro
+        return ((u, self._libros_por_id[book_id].isbn, marca) for u, book_id, marca in self.loan_queue.items)
+
+# Funcion: _reescribir_cola
+    def _reescribir_cola(self):
+        # Vuelca la cola completa al registro (compactacion)
+        if self.registro_cola is not None:
+            self.registro_cola.reescribir(self._registros_cola())
+
+# Funcion: _aplicar_datos
+    def _aplicar_datos(self, datos: Dict[str, Any]):
+        # Reemplaza el estado por el de 'datos' y reconstruye los indices
         # Restaurar libros
-        self.books = LinkedList()
-        for b in datos.get("libros", []):
+        self.books = self._nuevo_almacen()
+        libros = datos.get("libros", [])
+        if not self.catalogo_ordenado:
+            # Guardados en modo ordenado vienen por titulo: la lista vuelve
+            # al orden de alta (id creciente), que usa page_books
+            libros = ordenar(libros, key=lambda b: b.book_id)
+        for b in libros:
             self.books.append(b)
         # Restaurar usuarios
-        self.users = LinkedList()
+        self.users = UnrolledLinkedList()
         for u in datos.get("usuarios", []):
             self.users.append(u)
         # Restaurar historial
@@ -465,60 +3209,936 @@ class Biblioteca:
         # Restaurar relaciones (grafo)
         if "relaciones" in datos and isinstance(datos["relaciones"], Graph):
             self.relations = datos["relaciones"]
+        self._next_id = datos.get("siguiente_id", 1)
+        # La cola solo viene en las copias de una transaccion
+        self.loan_queue = Queue()
+        for req in datos.get("cola", []):
+            self.loan_queue.enqueue(req)
+        self._reindexar()
+
+# Funcion: transaction
+    @contextmanager
+    def transaction(self, archivo="biblioteca_data.pkl"):
+        # Agrupa varias operaciones en una transaccion:
+        #     with lib.transaction():
+        #         lib.request_loan(...); lib.process_next_loan(); ...
+        # Cada operacion anota en self._deshacer como volver atras su
+        # cambio; si el bloque lanza una excepcion esas acciones se
+        # ejecutan en orden inverso (nada de lo hecho queda) y la excepcion
+        # sigue su camino. Asi entrar y deshacer cuesta lo que cuestan las
+        # operaciones del bloque, no el tamaño de la biblioteca. Solo se
+        # copian la cola de prestamos y el largo del historial. Si termina
+        # bien se guarda en disco una sola vez. Una transaccion dentro de
+        # otra se suma a la de afuera. Los ids de libros creados en un
+        # bloque deshecho no se vuelven a usar
+        if self._en_transaccion:
+            yield self
+            return
+        cola = list(self.loan_queue.items)
+        largo_historial = len(self.history.items)
+        estado = dict(self._versiones), self.history.cambios, self._bytes_ahorrados
+        self._deshacer = []
+        self._en_transaccion = True
+        try:
+            yield self
+        except BaseException:
+            self._en_transaccion = False
+            acciones, self._deshacer = self._deshacer, []
+            for accion, args in reversed(acciones):
+                accion(*args)
+            self.loan_queue.items = cola
+            del self.history.items[largo_historial:]
+            # Tambien vuelven las versiones: lo que estaba guardado sigue
+            # guardado
+            self._versiones, self.history.cambios, self._bytes_ahorrados = estado
+            raise
+        finally:
+            self._en_transaccion = False
+            self._deshacer = []
+        # Dentro de la transaccion no se registran altas ni bajas de la
+        # cola: el guardado escribe un registro nuevo con la cola y el
+        # manifiesto confirma las dos cosas a la vez
+        self._cola_sin_registrar = True
+        self.guardar_datos(archivo)
+
+# Funcion: _al_deshacer
+    def _al_deshacer(self, accion, *args):
+        # Dentro de una transaccion anota como volver atras un cambio
+        if self._en_transaccion:
+            self._deshacer.append((accion, args))
+
+# Funcion: _posicion
+    def _posicion(self, almacen, predicate) -> int:
+        # Posicion del primer elemento que cumple 'predicate' (-1 si no hay)
+        for i, data in enumerate(almacen):
+            if predicate(data):
+                return i
+        return -1
+
+# Funcion: _deshacer_append
+    @staticmethod
+    def _deshacer_append(almacen, data):
+        # En la lista desenrollada lo agregado sigue al final (O(1)); en la
+        # SkipList ordenada se busca
+        if isinstance(almacen, UnrolledLinkedList) and almacen.tail and almacen.tail.items[-1] is data:
+            almacen.pop()
+        else:
+            almacen.remove(lambda x: x is data)
+
+# Funcion: _reinsertar
+    @staticmethod
+    def _reinsertar(almacen, posicion: int, data):
+        # Devuelve un elemento a la posicion que tenia (la SkipList lo
+        # ubica sola por su clave)
+        if isinstance(almacen, UnrolledLinkedList):
+            almacen.insert(posicion, data)
+        else:
+            almacen.append(data)
+
+# Funcion: _deshacer_altas
+    def _deshacer_altas(self, books: List[Book], con_nodo: bool):
+        # Inversa de add_book / add_books / un lote importado
+        for book in reversed(books):
+            self._deshacer_append(self.books, book)
+        self._desindexar_lote(books)
+        for book in books:
+            if con_nodo:
+                self.relations.remove_node(book.book_id)
+            self._liberar(book.author)
+            self._liberar(book.title)
+
+# Funcion: _categorias_de
+    def _categorias_de(self, book_id: int) -> List[Tuple[TreeNode, Tuple[str, ...]]]:
+        # (nodo, ruta) de cada categoria que contiene el libro
+        res = []
+        pendientes = [(self.categories, (self.categories.name,))]
+        while pendientes:
+            nodo, path = pendientes.pop()
+            if book_id in nodo.miembros:
+                res.append((nodo, path))
+            pendientes.extend((h, path + (h.name,)) for h in nodo.children)
+        return res
+
+# Funcion: _adyacencias
+    def _adyacencias(self, *nodos: int) -> Dict[int, Optional[List[int]]]:
+        # Copia de las listas de adyacencia de esos nodos (None si no estan)
+        adj = self.relations.adj
+        return {n: list(adj[n]) if n in adj else None for n in nodos}
+
+# Funcion: _restaurar_adyacencias
+    def _restaurar_adyacencias(self, copia: Dict[int, Optional[List[int]]]):
+        for nodo, vecinos in copia.items():
+            if vecinos is None:
+                self.relations.adj.pop(nodo, None)
+            else:
+                self.relations.adj[nodo] = vecinos
+
+# Funcion: _restaurar_libro
+    def _restaurar_libro(self, book: Book, posicion: int, categorias, adyacencias):
+        # Inversa de remove_book: el mismo Book vuelve a su lugar, a sus
+        # indices, a sus categorias y a sus relaciones
+        self._reinsertar(self.books, posicion, book)
+        self._internar(book.title)
+        self._internar(book.author)
+        self._indexar_libro(book)
+        for nodo, path in categorias:
+            nodo.miembros.add(book.book_id)
+            self.columnas.add_category(book.book_id, path)
+        self._restaurar_adyacencias(adyacencias)
+
+# Funcion: _deshacer_usuarios
+    def _deshacer_usuarios(self, users: List[User]):
+        # Inversa de add_user / add_users
+        for user in reversed(users):
+            self._deshacer_append(self.users, user)
+            self._liberar(user.user_id)
+
+# Funcion: _restaurar_usuario
+    def _restaurar_usuario(self, user: User, posicion: int):
+        # Inversa de remove_user
+        self._reinsertar(self.users, posicion, user)
+        self._internar(user.user_id)
+
+# Funcion: _anotar_ruta_nueva
+    def _anotar_ruta_nueva(self, path: List[str]):
+        # Si la ruta crea subcategorias, anota quitar la primera que falta
+        # (con ella se van las que cuelgan de ella)
+        if not self._en_transaccion:
+            return
+        nodo = self.categories
+        for part in path[1:]:
+            hijo = next((c for c in nodo.children if c.name == part), None)
+            if hijo is None:
+                self._al_deshacer(self._quitar_subcategoria, nodo, part)
+                return
+            nodo = hijo
+
+# Funcion: _quitar_subcategoria
+    def _quitar_subcategoria(self, padre: TreeNode, nombre: str):
+        padre.children[:] = [c for c in padre.children if c.name != nombre]
+
+# Funcion: _quitar_de_categoria
+    def _quitar_de_categoria(self, book_id: int, path: List[str]):
+        # Inversa de add_book_to_category
+        nodo = self.categories.find(path)
+        if nodo is not None:
+            nodo.miembros.discard(book_id)
+        self.columnas.remove_book_category(book_id, path)
+
+# Funcion: _restaurar_categoria
+    def _restaurar_categoria(self, padre: TreeNode, posicion: int, hijo: TreeNode, path: List[str]):
+        # Inversa de remove_category: el nodo vuelve con sus libros y las
+        # columnas recuperan esas categorias
+        padre.children.insert(posicion, hijo)
+        pendientes = [(hijo, tuple(path))]
+        while pendientes:
+            nodo, ruta = pendientes.pop()
+            for book_id in nodo.miembros:
+                self.columnas.add_category(book_id, ruta)
+            pendientes.extend((h, ruta + (h.name,)) for h in nodo.children)
+
+# Funcion: _nuevo_almacen
+    def _nuevo_almacen(self):
+        # Estructura donde se guardan los libros segun el modo elegido
+        if self.catalogo_ordenado:
+            return SkipList(key=lambda b: b.title.lower())
+        # Lista desenrollada: bloques de libros, recorridos mas rapidos
+        return UnrolledLinkedList()
+
+# Funcion: _reindexar
+    def _reindexar(self):
+        # Reconstruye los diccionarios id -> Book e isbn -> Book. Los datos
+        # de versiones anteriores no tenian ids: se asignan aqui y se migran
+        # el grafo y el arbol de categorias, que usaban titulos como clave.
+        self._libros_por_id = {}
+        self._libros_por_isbn = {}
+        self._cadenas, self._usos, self._bytes_ahorrados = {}, Counter(), 0
+        for b in self.books:
+            self._next_id = max(self._next_id, b.book_id + 1)
+        for b in self.books:
+            if not b.book_id:
+                b.book_id = self._nuevo_id()
+            # Tras unpickle cada libro trae sus propias copias de los textos
+            b.title = self._internar(b.title)
+            b.author = self._internar(b.author)
+            self._libros_por_id[b.book_id] = b
+            self._libros_por_isbn[b.isbn] = b
+        for u in self.users:
+            u.user_id = self._internar(u.user_id)
+        self.indice_titulos.rebuild(self.books)
+        self.indice_autores.rebuild(self.books)
+        self.disponibles = Bitset(b.book_id for b in self.books if b.available)
+        self.indice_texto.rebuild(self.books)
+        self.indice_trigramas.rebuild(self._libros_por_id)
+        self.indice_prefijos = RadixTree()
+        for book_id in self._libros_por_id:
+            self.indice_prefijos.insert(self.indice_titulos.clave_de(book_id), book_id)
+        for vista in self.vistas.values():
+            vista.rebuild(self.books)
+
+        # Migracion de claves por titulo (si el primer duplicado gana)
+        por_titulo: Dict[str, int] = {}
+        for b in self.books:
+            por_titulo.setdefault(b.title, b.book_id)
+        if any(isinstance(k, str) for k in self.relations.adj):
+            viejo = self.relations.adj
+            self.relations = Graph()
+            for titulo, vecinos in viejo.items():
+                if titulo not in por_titulo:
+                    continue
+                self.relations.add_node(por_titulo[titulo])
+                for v in vecinos:
+                    if v in por_titulo:
+                        self.relations.add_edge(por_titulo[titulo], por_titulo[v])
+        pendientes = [self.categories]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.titulos_legado:
+                for titulo in nodo.titulos_legado:
+                    if titulo in por_titulo:
+                        nodo.miembros.add(por_titulo[titulo])
+                nodo.titulos_legado = None
+            pendientes.extend(nodo.children)
+        self.columnas.rebuild(self.books, self.categories)
+
+# Funcion: _internar
+    def _internar(self, texto: str) -> str:
+        # Devuelve la copia unica de 'texto' y suma una referencia. Si el
+        # texto recibido era otra copia, esa copia se puede liberar
+        canon = self._cadenas.setdefault(texto, texto)
+        if canon is not texto:
+            self._bytes_ahorrados += sys.getsizeof(texto)
+        self._usos[canon] += 1
+        return canon
+
+# Funcion: _liberar
+    def _liberar(self, texto: str):
+        # Resta una referencia; sin referencias la cadena sale de la tabla
+        self._usos[texto] -= 1
+        if self._usos[texto] <= 0:
+            del self._usos[texto]
+            self._cadenas.pop(texto, None)
+
+# Funcion: interning_report
+    def interning_report(self) -> Dict[str, int]:
+        # Cadenas distintas, referencias a ellas y bytes que se dejaron de
+        # duplicar desde la ultima carga
+        return {
+            "cadenas": len(self._cadenas),
+            "referencias": sum(self._usos.values()),
+            "bytes_ahorrados": self._bytes_ahorrados,
+        }
+
+# Funcion: _nuevo_id
+    def _nuevo_id(self) -> int:
+        # Reserva el siguiente id entero; nunca se reutilizan
+        book_id = self._next_id
+        self._next_id += 1
+        return book_id
 
     # ---------------- LIBROS ----------------
 # Funcion: add_book
     def add_book(self, title: str, author: str, isbn: str):
         # Crea y agrega un Book a la lista ligada, y registra nodo en grafo
-        book = Book(title, author, isbn)
+        # Titulo y autor se repiten en muchos libros: se guardan internados
+        book = Book(self._internar(title), self._internar(author), isbn, book_id=self._nuevo_id())
         self.books.append(book)
+        self._indexar_libro(book)
         # Asegurar que el grafo tenga el nodo (aunque sin aristas aun)
-        self.relations.add_node(title)
+        self.relations.add_node(book.book_id)
+        self._marcar("libros", "relaciones")
+        self._al_deshacer(self._deshacer_altas, [book], True)
         # Registrar accion en historial
         self.history.push(f"|  Libro agregado: {title}")
         return book
 
+# Funcion: add_books
+    def add_books(self, items) -> List[Optional[Book]]:
+        # Version por lote de add_book: items es un iterable de (titulo,
+        # autor, isbn). Los indices se actualizan una vez para todo el lote
+        # y queda un solo registro en el historial. Devuelve, en el mismo
+        # orden, el Book creado o None si el ISBN ya existia (en el
+        # catalogo o antes en el mismo lote)
+        resultados: List[Optional[Book]] = []
+        nuevos: List[Book] = []
+        vistos = set()
+        for title, author, isbn in items:
+            if isbn in self._libros_por_isbn or isbn in vistos:
+                resultados.append(None)
+                continue
+            vistos.add(isbn)
+            book = Book(self._internar(title), self._internar(author), isbn, book_id=self._nuevo_id())
+            nuevos.append(book)
+            resultados.append(book)
+        if nuevos:
+            for book in nuevos:
+                self.books.append(book)
+                self.relations.add_node(book.book_id)
+            self._indexar_lote(nuevos)
+            self._marcar("libros", "relaciones")
+            self._al_deshacer(self._deshacer_altas, nuevos, True)
+            self.history.push(f"|  Libros agregados en lote: {len(nuevos)}")
+        return resultados
+
+# Funcion: _indexar_libro
+    def _indexar_libro(self, book: Book):
+        # Registra un libro nuevo en todos los indices
+        self._libros_por_id[book.book_id] = book
+        self._libros_por_isbn[book.isbn] = book
+        self.indice_titulos.add(book)
+        self.indice_autores.add(book)
+        if book.available:
+            self.disponibles.add(book.book_id)
+        self.indice_texto.add(book)
+        self.indice_trigramas.add(book.book_id)
+        self.indice_prefijos.insert(self.indice_titulos.clave_de(book.book_id), book.book_id)
+        for vista in self.vistas.values():
+            vista.add(book)
+        self.columnas.add(book)
+
+# Funcion: _indexar_lote
+    def _indexar_lote(self, books: List[Book]):
+        # Igual que _indexar_libro para muchos libros: los indices con
+        # arreglos ordenados (titulos, autores, vistas) se mezclan una vez
+        for book in books:
+            self._libros_por_id[book.book_id] = book
+            self._libros_por_isbn[book.isbn] = book
+        self.indice_titulos.add_many(books)
+        self.indice_autores.add_many(books)
+        for book in books:
+            if book.available:
+                self.disponibles.add(book.book_id)
+            self.indice_texto.add(book)
+            self.indice_trigramas.add(book.book_id)
+            self.indice_prefijos.insert(self.indice_titulos.clave_de(book.book_id), book.book_id)
+        for vista in self.vistas.values():
+            vista.add_many(books)
+        for book in books:
+            self.columnas.add(book)
+
+# Funcion: _desindexar_libro
+    def _desindexar_libro(self, book: Book):
+        # Quita un libro de todos los indices (en orden inverso al alta)
+        self.columnas.remove(book.book_id)
+        for vista in self.vistas.values():
+            vista.remove(book.book_id)
+        self.indice_prefijos.remove(self.indice_titulos.clave_de(book.book_id), book.book_id)
+        self.indice_trigramas.remove(book.book_id)
+        self.indice_texto.remove(book)
+        self.disponibles.discard(book.book_id)
+        self.indice_autores.remove(book.book_id)
+        self.indice_titulos.remove(book.book_id)
+        self._libros_por_isbn.pop(book.isbn, None)
+        self._libros_por_id.pop(book.book_id, None)
+
+# Funcion: _desindexar_lote
+    def _desindexar_lote(self, books: List[Book]):
+        # Igual que _desindexar_libro para muchos libros: cada vista
+        # ordenada decide si los quita de a uno o copiandose una vez
+        for book in books:
+            self.columnas.remove(book.book_id)
+        for vista in self.vistas.values():
+            vista.remove_many(b.book_id for b in books)
+        for book in books:
+            self.indice_prefijos.remove(self.indice_titulos.clave_de(book.book_id), book.book_id)
+            self.indice_trigramas.remove(book.book_id)
+            self.indice_texto.remove(book)
+            self.disponibles.discard(book.book_id)
+            self.indice_autores.remove(book.book_id)
+            self.indice_titulos.remove(book.book_id)
+            self._libros_por_isbn.pop(book.isbn, None)
+            self._libros_por_id.pop(book.book_id, None)
+
+# Funcion: import_books
+    def import_books(self, origen: str, formato: Optional[str] = None,
+                     lote: int = 10_000) -> ImportReport:
+        # Importa libros desde un CSV o JSON Lines ('-' = entrada estandar).
+        # Cada lote se indexa de una vez y deja un solo registro en el
+        # historial. Los ISBN ya cargados o repetidos en el archivo se
+        # descartan. A diferencia de add_book no se crean nodos en el grafo:
+        # se crean al relacionar el libro
+        if formato is None:
+            formato = formato_de(origen)
+        reporte = ImportReport()
+        inicio = time.perf_counter()
+        archivo = sys.stdin if origen == "-" else open(origen, encoding="utf-8", newline="")
+        # Se crean millones de objetos sin ciclos: el recolector de ciclos
+        # solo re-recorreria todo lo ya cargado una y otra vez
+        gc_activo = gc.isenabled()
+        gc.disable()
+        try:
+            pendientes: List[Book] = []
+            en_lote = set()
+            for fila in leer_filas(archivo, formato):
+                reporte.leidos += 1
+                datos = fila_a_libro(fila)
+                if datos is None:
+                    reporte.invalidos += 1
+                    continue
+                title, author, isbn, disponible = datos
+                if isbn in self._libros_por_isbn or isbn in en_lote:
+                    reporte.duplicados += 1
+                    if len(reporte.ejemplos_duplicados) < 10:
+                        reporte.ejemplos_duplicados.append(isbn)
+                    continue
+                en_lote.add(isbn)
+                pendientes.append(Book(self._internar(title), self._internar(author), isbn,
+                                       disponible, self._nuevo_id()))
+                if len(pendientes) >= lote:
+                    self._agregar_lote(pendientes, reporte)
+                    pendientes, en_lote = [], set()
+            if pendientes:
+                self._agregar_lote(pendientes, reporte)
+        finally:
+            if gc_activo:
+                gc.enable()
+            if archivo is not sys.stdin:
+                archivo.close()
+        reporte.segundos = time.perf_counter() - inicio
+        return reporte
+
+# Funcion: _agregar_lote
+    def _agregar_lote(self, books: List[Book], reporte: ImportReport):
+        # Guarda un lote ya validado y deja un unico evento en el historial
+        for book in books:
+            self.books.append(book)
+        self._indexar_lote(books)
+        self._marcar("libros")
+        self._al_deshacer(self._deshacer_altas, books, False)
+        reporte.agregados += len(books)
+        reporte.lotes += 1
+        self.history.push(f"|  Importacion: lote {reporte.lotes} con {len(books)} libros")
+
+# Funcion: export_rows
+    def export_rows(self, seccion: str):
+        # (columnas, generador de filas) de una seccion de datos. Las filas
+        # se arman al recorrer el generador, sin copiar las estructuras
+        if seccion == "libros":
+            return (("titulo", "autor", "isbn", "disponible"),
+                    self.columnas.export(("title", "author", "isbn", "available")))
+        if seccion == "usuarios":
+            return ("id", "nombre"), ((u.user_id, u.name) for u in self.users)
+        if seccion == "prestamos":
+            return (("posicion", "usuario", "isbn", "solicitado"),
+                    ((i, uid, self._libros_por_id[book_id].isbn,
+                      time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(marca)))
+                     for i, (uid, book_id, marca) in enumerate(self.loan_queue.items, 1)))
+        if seccion == "categorias":
+            return ("categoria", "isbn"), self._filas_categorias()
+        if seccion == "relaciones":
+            # Cada arista no dirigida una sola vez (id menor primero)
+            return (("isbn_a", "isbn_b"),
+                    ((self._libros_por_id[a].isbn, self._libros_por_id[b].isbn)
+                     for a, vecinos in self.relations.adj.items() for b in vecinos if a < b))
+        raise ValueError(f"Seccion desconocida: {seccion}")
+
+# Funcion: _filas_categorias
+    def _filas_categorias(self):
+        # (ruta, isbn) por cada libro de cada categoria; las categorias sin
+        # libros salen con isbn vacio para no perder la ruta
+        pendientes = [(self.categories, self.categories.name)]
+        while pendientes:
+            nodo, ruta = pendientes.pop()
+            if not nodo.miembros:
+                yield ruta, ""
+            for book_id in nodo.miembros:
+                yield ruta, self._libros_por_id[book_id].isbn
+            pendientes.extend((h, f"{ruta}/{h.name}") for h in reversed(nodo.children))
+
+# Funcion: export
+    def export(self, seccion: str, destino: str, formato: Optional[str] = None,
+               bloque: int = 10_000) -> int:
+        # Exporta una seccion a un archivo ('-' = salida estandar). El
+        # formato sale de la extension (.csv, .jsonl, .edges) si no se da.
+        # Devuelve la cantidad de filas escritas
+        if formato is None:
+            formato = FORMATOS_EXPORTACION.get(os.path.splitext(destino)[1].lower())
+            if formato is None:
+                raise ValueError(f"No se reconoce el formato de {destino!r}; indique 'csv', 'jsonl' o 'aristas'")
+        columnas, filas = self.export_rows(seccion)
+        if destino == "-":
+            return escribir_filas(sys.stdout, columnas, filas, formato, bloque)
+        with open(destino, "w", encoding="utf-8", newline="") as archivo:
+            return escribir_filas(archivo, columnas, filas, formato, bloque)
+
 # Funcion: find_book_by_isbn
     def find_book_by_isbn(self, isbn: str) -> Optional[Book]:
-        # Busca por ISBN recorriendo la lista ligada
-        return self.books.find(lambda b: b.isbn == isbn)
+        # Busca por ISBN en el diccionario isbn -> Book (O(1))
+        return self._libros_por_isbn.get(isbn)
+
+# Funcion: find_book_by_id
+    def find_book_by_id(self, book_id: int) -> Optional[Book]:
+        # Resuelve un id interno al Book correspondiente
+        return self._libros_por_id.get(book_id)
+
+# Funcion: find_book
+    def find_book(self, ref: str) -> Optional[Book]:
+        # Acepta ISBN o titulo; el ISBN tiene prioridad porque es unico
+        return self.find_book_by_isbn(ref) or self.find_book_by_title(ref)
+
+# Funcion: titulo_de
+    def titulo_de(self, book_id: int) -> str:
+        # Texto a mostrar para un id (grafo, categorias)
+        book = self._libros_por_id.get(book_id)
+        return book.title if book else f"#{book_id}"
 
 # Funcion: find_book_by_title
     def find_book_by_title(self, title: str) -> Optional[Book]:
-        # Busca por titulo recorriendo la lista ligada
-        return self.books.find(lambda b: b.title == title)
+        # Busca por titulo sin distinguir mayusculas ni acentos (indice
+        # normalizado, O(1)). Si varios coinciden, prefiere el titulo exacto
+        ids = self.indice_titulos.find(title)
+        if not ids:
+            return None
+        for book_id in ids:
+            if self._libros_por_id[book_id].title == title:
+                return self._libros_por_id[book_id]
+        return self._libros_por_id[ids[0]]
 
 # Funcion: list_books
-    def list_books(self):
-        # Devuelve todos los libros como lista para iterar o mostrar
-        return self.books.to_list()
+    def list_books(self, orden: Optional[str] = None) -> CatalogView:
+        # Devuelve una vista perezosa de todos los libros (no copia nada).
+        # Sin 'orden' respeta el orden de insercion; con orden ("titulo",
+        # "autor", "isbn", "disponibilidad") recorre la vista ordenada
+        if orden is None:
+            return CatalogView(lambda: iter(self.books), lambda: len(self._libros_por_id))
+        vista = self.vistas[orden]
+        return CatalogView(lambda: (self._libros_por_id[i] for i in vista), lambda: len(vista))
+
+# Funcion: page_books
+    def page_books(self, tamano: int, cursor: Optional[CatalogCursor] = None,
+                   orden: Optional[str] = "titulo") -> Tuple[List[Book], Optional[CatalogCursor]]:
+        # Devuelve una pagina de libros y el cursor para pedir la siguiente
+        # (None si ya no hay mas). En un orden de la vista el cursor retoma
+        # con busqueda binaria aunque entre paginas se agreguen o quiten
+        # libros; en el orden del almacen retoma donde quedo
+        if cursor is not None:
+            orden = cursor.orden
+        if orden is None:
+            return self._pagina_del_almacen(tamano, cursor)
+        vista = self.vistas[orden]
+        i = self._posicion_tras_cursor(vista, cursor) if cursor else 0
+        ids = vista.ids[i:i + tamano]
+        pagina = [self._libros_por_id[x] for x in ids]
+        if len(ids) < tamano:
+            return pagina, None
+        return pagina, CatalogCursor(orden, vista.valores[i + tamano - 1], ids[-1])
+
+# Funcion: _pagina_del_almacen
+    def _pagina_del_almacen(self, tamano: int, cursor: Optional[CatalogCursor]):
+        # Pagina en el orden de self.books (insercion, o titulo en modo
+        # ordenado). Cada pagina cuesta O(tamano), no O(posicion). En la
+        # lista desenrollada los libros estan por id creciente (cada alta
+        # recibe un id mayor y deshacer una baja devuelve el libro a su
+        # lugar): se sigue con el primer id mayor que el ultimo entregado,
+        # partiendo del bloque guardado. En la SkipList se busca la clave y
+        # se pasa al ultimo libro entregado
+        if isinstance(self.books, UnrolledLinkedList):
+            bloque, indice = self.books.head, 0
+            if cursor is not None:
+                bloque, indice = self.books.ubicar_despues(
+                    cursor.clave, cursor.book_id, key=lambda b: b.book_id)
+            pagina, marca, _ = self.books.leer_desde(bloque, indice, tamano)
+        elif cursor is None:
+            pagina = list(islice(self.books, tamano))
+            marca = self.books.key(pagina[-1]) if pagina else None
+        else:
+            pagina = []
+            pasado = False   # True una vez pasado el ultimo libro entregado
+            for book in self.books.range(desde=cursor.clave):
+                if not pasado and self.books.key(book) == cursor.clave:
+                    pasado = book.book_id == cursor.book_id
+                    continue
+                pasado = True
+                pagina.append(book)
+                if len(pagina) == tamano:
+                    break
+            marca = self.books.key(pagina[-1]) if pagina else None
+        if len(pagina) < tamano:
+            return pagina, None
+        return pagina, CatalogCursor(None, marca, pagina[-1].book_id)
+
+# Funcion: _posicion_tras_cursor
+    def _posicion_tras_cursor(self, vista: SortedView, cursor: CatalogCursor) -> int:
+        # Posicion siguiente al ultimo libro entregado; si ese libro ya no
+        # esta (o cambio de clave) se sigue despues de su clave anterior
+        i, j = equal_range(vista.valores, cursor.clave)
+        for k in range(i, j):
+            if vista.ids[k] == cursor.book_id:
+                return k + 1
+        return j
+
+# Funcion: books_with_title_prefix
+    def books_with_title_prefix(self, prefix: str) -> List[Book]:
+        # Libros cuyo titulo empieza con 'prefix' (sin distinguir mayusculas
+        # ni acentos), en orden de titulo, con busqueda binaria: O(log n + k)
+        return [self._libros_por_id[x] for x in self.indice_titulos.prefix(prefix)]
+
+# Funcion: search_books
+    def search_books(self, consulta: str, k=10) -> List[Tuple[Book, float]]:
+        # Busqueda por palabras en titulo y autor, ordenada por relevancia.
+        # Primero exige todas las palabras; si nada coincide, basta con una
+        res = self.indice_texto.buscar(consulta, k, todas=True)
+        if not res:
+            res = self.indice_texto.buscar(consulta, k, todas=False)
+        return [(self._libros_por_id[book_id], puntaje) for book_id, puntaje in res]
+
+# Funcion: search_fuzzy
+    def search_fuzzy(self, query: str, k=5) -> List[Tuple[Book, int]]:
+        # Titulos parecidos a 'query' aunque tenga errores de tipeo;
+        # devuelve (libro, distancia de edicion), los mas cercanos primero
+        return [(self._libros_por_id[book_id], dist)
+                for book_id, dist in self.indice_trigramas.buscar(query, k)]
+
+# Funcion: autocomplete
+    def autocomplete(self, prefix: str, n=10) -> List[str]:
+        # Hasta n titulos que empiezan con 'prefix' (sin importar mayusculas
+        # ni acentos), en orden alfabetico
+        clave = normalizar_texto(prefix, prefijo=True)
+        return [self._libros_por_id[ids[0]].title
+                for _, ids in self.indice_prefijos.completions(clave, n)]
+
+# Funcion: books_by_author
+    def books_by_author(self, author: str) -> List[Book]:
+        # Libros de un autor (sin importar mayusculas ni acentos), O(1 + k)
+        return [self._libros_por_id[i] for i in self.indice_autores.find(author)]
+
+# Funcion: books_by_author_prefix
+    def books_by_author_prefix(self, prefix: str) -> List[Book]:
+        # Libros de los autores cuyo nombre empieza con 'prefix', agrupados
+        # por autor en orden alfabetico: O(log n + k)
+        return [self._libros_por_id[i] for i in self.indice_autores.prefix(prefix)]
+
+# Funcion: query
+    def query(self, author: Optional[str] = None, available: Optional[bool] = None,
+              category: Optional[List[str]] = None, title_prefix: Optional[str] = None,
+              isbn_prefix: Optional[str] = None, where=None, explain=False):
+        # Consulta combinada; los filtros en None no se aplican. 'where' es
+        # un predicado libre sobre Book (no tiene indice). Con explain=True
+        # devuelve (libros, plan) para ver que indices se usaron.
+        filtros: List[FiltroConsulta] = []
+        if author is not None:
+            clave = normalizar_texto(author)
+            ids = self.indice_autores.exacto.get(clave, [])
+            filtros.append(FiltroConsulta(
+                f"indice de autores = '{clave}'", len(ids),
+                lambda i: self.indice_autores.clave_de(i) == clave, lambda: ids))
+        if title_prefix is not None:
+            # La vista por titulo tiene una clave por libro (el indice de
+            # titulos, una por titulo distinto): j - i cuenta libros
+            prefijo = normalizar_texto(title_prefix, prefijo=True)
+            vista_titulos = self.vistas["titulo"]
+            ti, tj = prefix_range(vista_titulos.valores, prefijo)
+            filtros.append(FiltroConsulta(
+                f"vista por titulo, prefijo '{prefijo}'", tj - ti,
+                lambda x: self.indice_titulos.clave_de(x).startswith(prefijo),
+                lambda: vista_titulos.ids[ti:tj]))
+        if isbn_prefix is not None:
+            vista = self.vistas["isbn"]
+            i, j = prefix_range(vista.valores, isbn_prefix)
+            filtros.append(FiltroConsulta(
+                f"vista por ISBN, prefijo '{isbn_prefix}'", j - i,
+                lambda x: self._libros_por_id[x].isbn.startswith(isbn_prefix),
+                lambda: vista.ids[i:j]))
+        if category is not None:
+            nodo = self.categories.find(category) if category else None
+            miembros = nodo.subtree_bitmap() if nodo else RoaringBitmap()
+            filtros.append(FiltroConsulta(
+                f"categoria '{'/'.join(category)}'", len(miembros),
+                miembros.__contains__, lambda: miembros))
+        if available is not None:
+            if available:
+                estimado = len(self.disponibles)
+                contiene = self.disponibles.__contains__
+                candidatos = lambda: iter(self.disponibles)
+            else:
+                estimado = self.count_on_loan()
+                contiene = lambda i: i not in self.disponibles
+                candidatos = None   # los prestados no tienen su propio bitset
+            filtros.append(FiltroConsulta(
+                f"bitset de disponibles = {available}", estimado, contiene, candidatos))
+        if where is not None:
+            filtros.append(FiltroConsulta(
+                "predicado libre", len(self._libros_por_id),
+                lambda i: where(self._libros_por_id[i])))
+
+        ids, plan = ejecutar_plan(filtros, self._libros_por_id)
+        libros = [self._libros_por_id[i] for i in ordenar(ids)]
+        if explain:
+            return libros, "\n".join(plan)
+        return libros
+
+# Funcion: books_with_isbn_prefix
+    def books_with_isbn_prefix(self, prefix: str) -> List[Book]:
+        # Libros de un prefijo de ISBN (por ejemplo el de una editorial)
+        vista = self.vistas["isbn"]
+        i, j = prefix_range(vista.valores, prefix)
+        return [self._libros_por_id[x] for x in vista.ids[i:j]]
+
+# Funcion: books_in_isbn_range
+    def books_in_isbn_range(self, desde: str, hasta: str) -> List[Book]:
+        # Libros con desde <= ISBN <= hasta (comparacion de texto)
+        vista = self.vistas["isbn"]
+        i, j = key_range(vista.valores, desde, hasta)
+        return [self._libros_por_id[x] for x in vista.ids[i:j]]
 
 # Funcion: sort_books_by_title
     def sort_books_by_title(self):
-        # Ordena libros por titulo usando burbuja
-        arr = self.list_books()
-        sorted_arr = bubble_sort(arr, key=lambda b: b.title.lower())
-        # Reconstruir la linked list con el orden nuevo
-        self.books = LinkedList()
-        for b in sorted_arr:
-            self.books.append(b)
+        # Devuelve los libros por titulo usando la vista ordenada; ya no
+        # reconstruye la lista ligada, asi se conserva el orden de insercion
         self.history.push("|  Libros ordenados por titulo")
+        return self.list_books("titulo")
+
+# Funcion: _cambiar_disponibilidad
+    def _cambiar_disponibilidad(self, book: Book, disponible: bool):
+        # Unico punto donde cambia 'available', para mantener las vistas
+        # y el bitset de disponibles
+        self._al_deshacer(self._cambiar_disponibilidad, book, book.available)
+        book.available = disponible
+        if disponible:
+            self.disponibles.add(book.book_id)
+        else:
+            self.disponibles.discard(book.book_id)
+        self.vistas["disponibilidad"].update(book)
+        self.columnas.set_available(book.book_id, disponible)
+        self._marcar("libros")
+
+# Funcion: _cambiar_disponibilidad_lote
+    def _cambiar_disponibilidad_lote(self, books: List[Book], disponible: bool):
+        # Como _cambiar_disponibilidad para muchos libros: la vista de
+        # disponibilidad se reacomoda una sola vez con los que cambiaron
+        cambiados = [b for b in books if b.available != disponible]
+        self._al_deshacer(self._cambiar_disponibilidad_lote, cambiados, not disponible)
+        for book in cambiados:
+            book.available = disponible
+            if disponible:
+                self.disponibles.add(book.book_id)
+            else:
+                self.disponibles.discard(book.book_id)
+            self.columnas.set_available(book.book_id, disponible)
+        vista = self.vistas["disponibilidad"]
+        vista.remove_many(b.book_id for b in cambiados)
+        vista.add_many(cambiados)
+        if cambiados:
+            self._marcar("libros")
+
+# Funcion: count_available
+    def count_available(self) -> int:
+        # Libros disponibles, O(1) (popcount del bitset)
+        return len(self.disponibles)
+
+# Funcion: count_on_loan
+    def count_on_loan(self) -> int:
+        # Libros prestados, O(1)
+        return len(self._libros_por_id) - len(self.disponibles)
+
+# Funcion: iter_available
+    def iter_available(self):
+        # Recorre los libros disponibles en orden de id recorriendo bits
+        for book_id in self.disponibles:
+            yield self._libros_por_id[book_id]
+
+# Funcion: available_in_category
+    def available_in_category(self, category_path: List[str]) -> List[Book]:
+        # Libros disponibles de una categoria y sus subcategorias
+        return self.category_union(category_path, available=True)
+
+# Funcion: category_set
+    def category_set(self, category_path: List[str]) -> RoaringBitmap:
+        # Bitmap con los ids de la categoria y sus subcategorias
+        nodo = self.categories.find(category_path) if category_path else None
+        return nodo.subtree_bitmap() if nodo else RoaringBitmap()
+
+# Funcion: _libros_de_bitmap
+    def _libros_de_bitmap(self, ids: RoaringBitmap, available: Optional[bool]) -> List[Book]:
+        # Convierte un bitmap en libros, filtrando por disponibilidad si se pide
+        if available is None:
+            return [self._libros_por_id[i] for i in ids]
+        return [self._libros_por_id[i] for i in ids if (i in self.disponibles) == available]
+
+# Funcion: category_union
+    def category_union(self, *paths: List[str], available: Optional[bool] = None) -> List[Book]:
+        # Libros que estan en alguna de las categorias
+        res = RoaringBitmap()
+        for path in paths:
+            res = res | self.category_set(path)
+        return self._libros_de_bitmap(res, available)
+
+# Funcion: category_intersection
+    def category_intersection(self, *paths: List[str], available: Optional[bool] = None) -> List[Book]:
+        # Libros que estan en todas las categorias (la mas chica primero)
+        if not paths:
+            return []
+        conjuntos = ordenar([self.category_set(p) for p in paths], key=len)
+        res = conjuntos[0]
+        for otro in conjuntos[1:]:
+            res = res & otro
+        return self._libros_de_bitmap(res, available)
+
+# Funcion: category_difference
+    def category_difference(self, path: List[str], *excluir: List[str],
+                            available: Optional[bool] = None) -> List[Book]:
+        # Libros de 'path' que no estan en ninguna de las categorias 'excluir'
+        res = self.category_set(path)
+        for otro in excluir:
+            res = res - self.category_set(otro)
+        return self._libros_de_bitmap(res, available)
+
+# Funcion: remove_book
+    def remove_book(self, isbn: str) -> bool:
+        # Elimina el libro y todo lo que lo referencia: grafo, cola y categorias
+        book = self._libros_por_isbn.get(isbn)
+        posicion = None
+        if book and self._en_transaccion:
+            posicion = self._posicion(self.books, lambda b: b is book)
+        if not book or not self.books.remove(lambda b: b is book):
+            return False
+        if self._en_transaccion:
+            self._al_deshacer(self._restaurar_libro, book, posicion,
+                              self._categorias_de(book.book_id),
+                              self._adyacencias(book.book_id, *self.relations.adj.get(book.book_id, ())))
+        self._desindexar_libro(book)
+        self._liberar(book.title)
+        self._liberar(book.author)
+        self.relations.remove_node(book.book_id)
+        # Eliminar de la cola de préstamos cualquier solicitud pendiente de este libro
+        self._filtrar_cola(lambda req: req[1] != book.book_id)
+        # Eliminar de todas las categorías del árbol
+        self.categories.remove_book(book.book_id)
+        self._marcar("libros", "relaciones", "categorias")
+        return True
 
     # ---------------- USUARIOS ----------------
 # Funcion: add_user
     def add_user(self, user_id: str, name: str):
         # Crea y agrega un usuario a la lista ligada
-        user = User(user_id, name)
+        user = User(self._internar(user_id), name)
         self.users.append(user)
+        self._marcar("usuarios")
+        self._al_deshacer(self._deshacer_usuarios, [user])
         self.history.push(f"|  Usuario agregado: {name}")
         return user
 
+# Funcion: add_users
+    def add_users(self, items) -> List[Optional[User]]:
+        # Version por lote de add_user: items es un iterable de (id, nombre).
+        # Los ids existentes se leen una sola vez (no un find por usuario).
+        # Devuelve el User creado o None si el id ya existia o se repite
+        vistos = {u.user_id for u in self.users}
+        resultados: List[Optional[User]] = []
+        agregados: List[User] = []
+        for user_id, name in items:
+            if user_id in vistos:
+                resultados.append(None)
+                continue
+            vistos.add(user_id)
+            user = User(self._internar(user_id), name)
+            self.users.append(user)
+            resultados.append(user)
+            agregados.append(user)
+        if agregados:
+            self._marcar("usuarios")
+            self._al_deshacer(self._deshacer_usuarios, agregados)
+            self.history.push(f"|  Usuarios agregados en lote: {len(agregados)}")
+        return resultados
+
 # Funcion: find_user
     def find_user(self, user_id: str) -> Optional[User]:
         # Busca un usuario por su id en la lista ligada
         return self.users.find(lambda u: u.user_id == user_id)
 
+# Funcion: remove_user
+    def remove_user(self, user_id: str) -> bool:
+        # Elimina el usuario y sus solicitudes de prestamo pendientes
+        posicion = user = None
+        if self._en_transaccion:
+            posicion = self._posicion(self.users, lambda u: u.user_id == user_id)
+            user = self.find_user(user_id)
+        if not self.users.remove(lambda u: u.user_id == user_id):
+            return False
+        if user is not None:
+            self._al_deshacer(self._restaurar_usuario, user, posicion)
+        self._liberar(user_id)
+        self._marcar("usuarios")
+        self._filtrar_cola(lambda req: req[0] != user_id)
+        return True
+
     # ---------------- PRESTAMOS ----------------
+# Funcion: _filtrar_cola
+    def _filtrar_cola(self, conservar):
+        # Deja en la cola solo las solicitudes que cumplen 'conservar'; si
+        # se quito alguna, el registro en disco se reescribe
+        nueva_cola = Queue()
+        quitadas = 0
+        while not self.loan_queue.is_empty():
+            req = self.loan_queue.dequeue()
+            if conservar(req):
+                nueva_cola.enqueue(req)
+            else:
+                quitadas += 1
+        self.loan_queue = nueva_cola
+        if quitadas and not self._en_transaccion:
+            self._reescribir_cola()
+
 # Funcion: request_loan
     def request_loan(self, user_id: str, isbn: str):
         # Registra la solicitud de prestamo en la cola.
@@ -531,11 +4151,23 @@ class Biblioteca:
         if not user:
             return f"|  No existe usuario con ID {user_id}"
 
-        # Encolar la solicitud; se procesara por orden FIFO
-        self.loan_queue.enqueue((user_id, isbn))
+        # Encolar la solicitud (usuario, id de libro, hora); se procesara por
+        # orden FIFO (el id se toma del User para reutilizar su cadena
+        # internada). El alta queda en disco en el registro de la cola
+        marca = round(time.time(), 3)
+        self.loan_queue.enqueue((user.user_id, book.book_id, marca))
+        if self.registro_cola is not None and not self._en_transaccion:
+            self.registro_cola.alta(user.user_id, book.isbn, marca)
         self.history.push(f"|  Solicitud prestamo: {user_id} -> {isbn}")
         return "|  Solicitud registrada"
 
+# Funcion: has_pending_request
+    def has_pending_request(self, user_id: str, isbn: str) -> bool:
+        # Indica si ya hay una solicitud en cola de ese usuario por ese libro
+        book = self.find_book_by_isbn(isbn)
+        return book is not None and any(
+            u == user_id and b == book.book_id for u, b, _ in self.loan_queue.items)
+
 # Funcion: process_next_loan
     def process_next_loan(self):
         # Procesa la siguiente solicitud en la cola
@@ -543,12 +4175,19 @@ class Biblioteca:
         if not req:
             return "|  No hay solicitudes"
 
-        user_id, isbn = req
-        book = self.find_book_by_isbn(isbn)
+        user_id, book_id, _ = req
+        book = self.find_book_by_id(book_id)
+        isbn = book.isbn if book else f"#{book_id}"
+        concedido = book is not None and book.available
+        # La baja y su resultado quedan juntos en el registro de la cola
+        if self.registro_cola is not None and not self._en_transaccion:
+            self.registro_cola.baja(isbn if concedido else None)
+            if self.registro_cola.conviene_compactar():
+                self._reescribir_cola()
 
-        if book and book.available:
+        if concedido:
             # Asignar el libro al usuario (marcar como no disponible)
-            book.available = False
+            self._cambiar_disponibilidad(book, False)
             self.history.push(f"|  Prestamo procesado: {user_id} obtuvo {isbn}")
             return f"|  Prestamo concedido -> {user_id} obtiene {book.title}"
 
@@ -562,10 +4201,44 @@ class Biblioteca:
         book = self.find_book_by_isbn(isbn)
         if not book:
             return "|  Libro no encontrado"
-        book.available = True
+        self._cambiar_disponibilidad(book, True)
+        self._anotar_devolucion([isbn])
         self.history.push(f"|  Devolucion: {isbn}")
         return f"|  Libro {book.title} devuelto"
 
+# Funcion: return_books
+    def return_books(self, isbns) -> List[str]:
+        # Devolucion por lote (por ejemplo, una estacion con lector de
+        # codigos): todos los libros cambian de estado juntos y queda un
+        # solo registro en el historial. Devuelve un mensaje por ISBN
+        resultados: List[str] = []
+        devueltos: List[Book] = []
+        vistos = set()
+        for isbn in isbns:
+            book = self._libros_por_isbn.get(isbn)
+            if not book:
+                resultados.append("|  Libro no encontrado")
+            elif isbn in vistos:
+                resultados.append("|  Devolucion repetida en el lote")
+            else:
+                vistos.add(isbn)
+                devueltos.append(book)
+                resultados.append(f"|  Libro {book.title} devuelto")
+        if devueltos:
+            self._cambiar_disponibilidad_lote(devueltos, True)
+            self._anotar_devolucion([b.isbn for b in devueltos])
+            self.history.push(f"|  Devolucion en lote: {len(devueltos)} libros")
+        return resultados
+
+# Funcion: _anotar_devolucion
+    def _anotar_devolucion(self, isbns: List[str]):
+        # Las devoluciones van al registro de la cola como los prestamos,
+        # para que no se pierdan si se cierra sin guardar
+        if self.registro_cola is not None and not self._en_transaccion:
+            self.registro_cola.devolucion(isbns)
+            if self.registro_cola.conviene_compactar():
+                self._reescribir_cola()
+
     # ---------------- CATEGORIAS ----------------
 # Funcion: add_category
     def add_category(self, path: List[str]):
@@ -574,55 +4247,108 @@ class Biblioteca:
         if not path or path[0] != self.categories.name:
             return False
 
+        self._anotar_ruta_nueva(path)
         node = self.categories
         for part in path[1:]:
             node = node.add_child(part)
 
+        self._marcar("categorias")
         self.history.push(f"|  Categoria agregada: {'/'.join(path)}")
         return True
 
 # Funcion: add_book_to_category
     def add_book_to_category(self, category_path: List[str], isbn: str):
-        # Agrega el titulo de un libro a una categoria del arbol
+        # Agrega el id de un libro a una categoria del arbol
         book = self.find_book_by_isbn(isbn)
         if not book:
             return "|  Libro no encontrado"
 
-        ok = self.categories.add_book(category_path, book.title)
+        if category_path and category_path[0] == self.categories.name:
+            self._anotar_ruta_nueva(category_path)
+            nodo = self.categories.find(category_path)
+            if nodo is None or book.book_id not in nodo.miembros:
+                self._al_deshacer(self._quitar_de_categoria, book.book_id, category_path)
+        ok = self.categories.add_book(category_path, book.book_id)
         if ok:
+            self.columnas.add_category(book.book_id, category_path)
+            self._marcar("categorias")
             self.history.push(f"|  Libro {book.title} agregado a {'/'.join(category_path)}")
             return "|  Libro agregado"
         return "|  Categoria no existente"
 
+# Funcion: remove_category
+    def remove_category(self, path: List[str]):
+        # Elimina una subcategoria (con todas sus subcategorias); la raiz no
+        # se puede eliminar. Los libros siguen en el catalogo
+        if len(path) < 2:
+            return "|  Ruta inválida."
+        padre = self.categories.find(path[:-1])
+        if not padre:
+            return "|  No se encontró la ruta padre."
+        hijo = next((c for c in padre.children if c.name == path[-1]), None)
+        if hijo is None:
+            return "|  No se encontró la subcategoría."
+        posicion = next(i for i, c in enumerate(padre.children) if c is hijo)
+        self._al_deshacer(self._restaurar_categoria, padre, posicion, hijo, path)
+        padre.children.remove(hijo)
+        self.columnas.remove_category(path)
+        self._marcar("categorias")
+        self.history.push(f"|  Categoria eliminada: {'/'.join(path)}")
+        return "|  Categoría eliminada."
+
     # ---------------- RELACIONES ENTRE LIBROS (GRAFO) ----------------
 # Funcion: relate_books
-    def relate_books(self, title_a: str, title_b: str):
-        # Crea una relacion entre dos titulos en el grafo
-        self.relations.add_edge(title_a, title_b)
-        self.history.push(f"|  Relacion creada: {title_a} <-> {title_b}")
+    def relate_books(self, ref_a: str, ref_b: str):
+        # Crea una relacion entre dos libros (por ISBN o titulo) en el grafo
+        book_a, book_b = self.find_book(ref_a), self.find_book(ref_b)
+        if not book_a or not book_b:
+            return "|  Ambos libros deben existir para crear la relación."
+        if book_a is book_b:
+            return "|  No se puede relacionar un libro consigo mismo."
+        if self._en_transaccion:
+            self._al_deshacer(self._restaurar_adyacencias,
+                              self._adyacencias(book_a.book_id, book_b.book_id))
+        self.relations.add_edge(book_a.book_id, book_b.book_id)
+        self._marcar("relaciones")
+        self.history.push(f"|  Relacion creada: {book_a.title} <-> {book_b.title}")
         return "|  Relacion registrada"
 
+# Funcion: unrelate_books
+    def unrelate_books(self, ref_a: str, ref_b: str):
+        # Elimina la relacion entre dos libros (por ISBN o titulo)
+        book_a, book_b = self.find_book(ref_a), self.find_book(ref_b)
+        if book_a and book_b:
+            if self._en_transaccion:
+                self._al_deshacer(self._restaurar_adyacencias,
+                                  self._adyacencias(book_a.book_id, book_b.book_id))
+            self.relations.remove_edge(book_a.book_id, book_b.book_id)
+            self._marcar("relaciones")
+        return "|  Relación eliminada"
+
 # Funcion: related_books
-    def related_books(self, title: str) -> List[str]:
-        # Devuelve la lista de libros relacionados a un titulo
-        return self.relations.neighbors(title)
+    def related_books(self, ref: str) -> List[str]:
+        # Devuelve los titulos de los libros relacionados a un libro
+        book = self.find_book(ref)
+        if not book:
+            return []
+        return [self.titulo_de(v) for v in self.relations.neighbors(book.book_id)]
 
     # ---------------- REPORTES ----------------
 # Funcion: show_history
     def show_history(self, n=10):
         # Muestra las ultimas n acciones registradas en la pila (top es ultima)
-        for h in reversed(self.history.to_list()[-n:]):
+        for h in islice(reversed(self.history.items), n):
             print(h)
 
 # Funcion: show_categories
     def show_categories(self):
         # Muestra el arbol de categorias desde la raiz
-        self.categories.show()
+        self.categories.show(label=self.titulo_de)
 
 # Funcion: show_relations
     def show_relations(self):
         # Muestra el grafo de relaciones (lista de adyacencia)
-        self.relations.show()
+        self.relations.show(label=self.titulo_de)
 
 # Funcion: mostrar_tabla_en_ventana
 def mostrar_tabla_en_ventana(tabla_str, titulo="Tabla"):
@@ -634,6 +4360,176 @@ def mostrar_tabla_en_ventana(tabla_str, titulo="Tabla"):
     text_area.config(state=tk.DISABLED)
     ventana.mainloop()
 
+
+# ======================================================================
+#region VISOR DEL GRAFO
+# ======================================================================
+# Ventana para explorar el grafo de relaciones. El layout se calcula en
+# un hilo aparte (la ventana no se congela) y al dibujar solo se crean
+# en el Canvas los nodos y aristas visibles. Arrastrar con el raton
+# mueve la vista y la rueda hace zoom alrededor del puntero.
+# ======================================================================
+
+class VisorGrafo:
+    RADIO_NODO = 25          # radio del nodo en coordenadas del mundo
+    MAX_ETIQUETAS = 400      # mas nodos visibles que esto: sin texto
+
+# Funcion: __init__
+    def __init__(self, ventana, nodos: List[Any], aristas: List[Tuple[int, int]], etiqueta=str):
+        self.ventana = ventana
+        self.nodos = nodos
+        self.aristas = aristas
+        self.etiqueta = etiqueta
+        # Adyacencia por indice para saber que aristas tocan un nodo visible
+        self.adyacentes: List[List[int]] = [[] for _ in nodos]
+        for i, j in aristas:
+            self.adyacentes[i].append(j)
+            self.adyacentes[j].append(i)
+        self.pos: List[Tuple[float, float]] = []
+        self.celdas: Dict[Tuple[int, int], List[int]] = {}
+        self.tam_celda = 4 * VisorGrafo.RADIO_NODO * 2
+        # Transformacion mundo -> pantalla: pantalla = (mundo - origen) * escala
+        self.escala = 1.0
+        self.origen = [0.0, 0.0]
+        self._arrastre = None
+        self._redibujo_pendiente = False
+        self._resultado: List[Any] = []
+
+        self.canvas = tk.Canvas(ventana, width=700, height=500, bg="white")
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.create_text(350, 250, text="Calculando disposicion...", font=("Arial", 12))
+        self.canvas.bind("<ButtonPress-1>", self._iniciar_arrastre)
+        self.canvas.bind("<B1-Motion>", self._arrastrar)
+        self.canvas.bind("<MouseWheel>", self._zoom)       # Windows / macOS
+        self.canvas.bind("<Button-4>", self._zoom)         # Linux rueda arriba
+        self.canvas.bind("<Button-5>", self._zoom)         # Linux rueda abajo
+        self.canvas.bind("<Configure>", lambda e: self.programar_redibujo())
+
+        # Calcular el layout fuera del hilo de la interfaz
+        hilo = threading.Thread(target=self._calcular, daemon=True)
+        hilo.start()
+        self.ventana.after(50, self._esperar_layout)
+
+# Funcion: _calcular
+    def _calcular(self):
+        # Corre en segundo plano; Tk no es thread-safe, asi que solo dejamos
+        # el resultado y el hilo principal lo recoge con after()
+        self._resultado.append(calcular_layout(len(self.nodos), self.aristas))
+
+# Funcion: _esperar_layout
+    def _esperar_layout(self):
+        if not self._resultado:
+            self.ventana.after(50, self._esperar_layout)
+            return
+        self.pos = self._resultado.pop()
+        # Indice espacial (rejilla) para encontrar rapido los nodos visibles
+        for i, (x, y) in enumerate(self.pos):
+            clave = (int(x // self.tam_celda), int(y // self.tam_celda))
+            self.celdas.setdefault(clave, []).append(i)
+        self.ajustar_vista()
+
+# Funcion: ajustar_vista
+    def ajustar_vista(self):
+        # Encuadra todo el grafo en la ventana
+        ancho = max(self.canvas.winfo_width(), 100)
+        alto = max(self.canvas.winfo_height(), 100)
+        margen = 2 * VisorGrafo.RADIO_NODO
+        xs = [p[0] for p in self.pos]
+        ys = [p[1] for p in self.pos]
+        min_x, max_x = min(xs) - margen, max(xs) + margen
+        min_y, max_y = min(ys) - margen, max(ys) + margen
+        self.escala = min(ancho / (max_x - min_x), alto / (max_y - min_y), 1.5)
+        # Centrar el contenido
+        self.origen = [
+            (min_x + max_x) / 2 - ancho / (2 * self.escala),
+            (min_y + max_y) / 2 - alto / (2 * self.escala),
+        ]
+        self.programar_redibujo()
+
+# Funcion: programar_redibujo
+    def programar_redibujo(self):
+        # Agrupa varios eventos seguidos (arrastre, zoom) en un solo dibujo
+        if self.pos and not self._redibujo_pendiente:
+            self._redibujo_pendiente = True
+            self.ventana.after_idle(self.redibujar)
+
+# Funcion: nodos_visibles
+    def nodos_visibles(self) -> List[int]:
+        # Devuelve los indices de nodos dentro del rectangulo visible
+        ancho, alto = self.canvas.winfo_width(), self.canvas.winfo_height()
+        r = VisorGrafo.RADIO_NODO
+        x0, y0 = self.origen[0] - r, self.origen[1] - r
+        x1, y1 = self.origen[0] + ancho / self.escala + r, self.origen[1] + alto / self.escala + r
+        c = self.tam_celda
+        cx0, cx1 = int(x0 // c), int(x1 // c)
+        cy0, cy1 = int(y0 // c), int(y1 // c)
+        # Si el rectangulo abarca mas celdas de las que existen, recorrer las existentes
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.celdas):
+            claves = [k for k in self.celdas if cx0 <= k[0] <= cx1 and cy0 <= k[1] <= cy1]
+        else:
+            claves = [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+        visibles = []
+        for clave in claves:
+            for i in self.celdas.get(clave, ()):
+                x, y = self.pos[i]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    visibles.append(i)
+        return visibles
+
+# Funcion: redibujar
+    def redibujar(self):
+        self._redibujo_pendiente = False
+        self.canvas.delete("all")
+        visibles = self.nodos_visibles()
+        es_visible = set(visibles)
+        ox, oy, s = self.origen[0], self.origen[1], self.escala
+
+        # Aristas: las que tocan al menos un nodo visible (una sola vez)
+        for i in visibles:
+            x1, y1 = self.pos[i]
+            for j in self.adyacentes[i]:
+                if j in es_visible and j < i:
+                    continue
+                x2, y2 = self.pos[j]
+                self.canvas.create_line((x1 - ox) * s, (y1 - oy) * s, (x2 - ox) * s, (y2 - oy) * s,
+                                        fill="gray", width=2)
+
+        # Nodos; las etiquetas solo si hay pocos nodos en pantalla y zoom suficiente
+        r = VisorGrafo.RADIO_NODO * s
+        con_texto = len(visibles) <= VisorGrafo.MAX_ETIQUETAS and s >= 0.5
+        for i in visibles:
+            x, y = (self.pos[i][0] - ox) * s, (self.pos[i][1] - oy) * s
+            self.canvas.create_oval(x - r, y - r, x + r, y + r, fill="#cce5ff", outline="#333", width=2)
+            if con_texto:
+                self.canvas.create_text(x, y, text=self.etiqueta(self.nodos[i]),
+                                        font=("Arial", 10, "bold"), width=80 * s)
+
+# Funcion: _iniciar_arrastre
+    def _iniciar_arrastre(self, event):
+        self._arrastre = (event.x, event.y)
+
+# Funcion: _arrastrar
+    def _arrastrar(self, event):
+        # Mover la vista segun el desplazamiento del raton
+        if self._arrastre is None:
+            return
+        px, py = self._arrastre
+        self.origen[0] -= (event.x - px) / self.escala
+        self.origen[1] -= (event.y - py) / self.escala
+        self._arrastre = (event.x, event.y)
+        self.programar_redibujo()
+
+# Funcion: _zoom
+    def _zoom(self, event):
+        # Zoom centrado en el puntero: el punto bajo el raton no se mueve
+        acercar = event.num == 4 or getattr(event, "delta", 0) > 0
+        factor = 1.2 if acercar else 1 / 1.2
+        mundo_x = self.origen[0] + event.x / self.escala
+        mundo_y = self.origen[1] + event.y / self.escala
+        self.escala = min(max(self.escala * factor, 0.01), 10.0)
+        self.origen = [mundo_x - event.x / self.escala, mundo_y - event.y / self.escala]
+        self.programar_redibujo()
+
 # ======================================================================
 #region MENU INTERACTIVO
 # ======================================================================
@@ -642,6 +4538,57 @@ def mostrar_tabla_en_ventana(tabla_str, titulo="Tabla"):
 # y le mantengo mensajes simples y claras instrucciones sobre formato
 # ======================================================================
 
+# Funcion: pedir_titulo
+def pedir_titulo(lib, mensaje):
+    # Pide un titulo con autocompletado: Tab completa (si hay readline) y
+    # terminar lo escrito con '?' lista los titulos que empiezan asi
+    anterior = delimitadores = None
+    if readline is not None:
+        # El completer y los delimitadores son globales de readline: se
+        # guardan para dejarlos como estaban al salir
+        anterior = readline.get_completer()
+        delimitadores = readline.get_completer_delims()
+        opciones = []
+
+        def completar(texto, estado):
+            if estado == 0:
+                opciones[:] = lib.autocomplete(readline.get_line_buffer(), 10)
+            return opciones[estado] if estado < len(opciones) else None
+
+        readline.set_completer_delims("")
+        readline.set_completer(completar)
+        readline.parse_and_bind("tab: complete")
+    try:
+        while True:
+            texto = input(mensaje)
+            if not texto.endswith("?"):
+                return texto
+            sugerencias = lib.autocomplete(texto[:-1], 10)
+            for t in sugerencias:
+                print(f"|    - {t}")
+            if not sugerencias:
+                print("|    (sin coincidencias)")
+    finally:
+        if readline is not None:
+            readline.set_completer(anterior)
+            readline.set_completer_delims(delimitadores)
+
+# Funcion: mostrar_libros
+def mostrar_libros(libros, tamano=20):
+    # Muestra una vista de libros en tablas de 'tamano' filas; solo se
+    # arma la tabla de la pagina actual. Devuelve False si no habia libros
+    hay = False
+    for pagina in libros.paginas(tamano):
+        if hay and input("|  Enter para ver más, 0 para terminar: ") == "0":
+            break
+        hay = True
+        tabla = [
+            [str(b.title), str(b.author), str(b.isbn), "Disponible" if b.available else "Prestado"]
+            for b in pagina
+        ]
+        print(tabulate(tabla, headers=["Titulo", "Autor", "ISBN", "Estado"], tablefmt="grid", stralign="center"))
+    return hay
+
 # Funcion: limpiar_pantalla
 def limpiar_pantalla():
     # Limpia la pantalla de la consola (Windows y Unix)
@@ -653,7 +4600,8 @@ def menu_libros(lib):
         limpiar_pantalla()
         print("|--------------------------|         LIBROS         |--------------------------|")
         print("| 1. Agregar libro           2. Eliminar libro         3. Mostrar libros       |")
-        print("| 4. Buscar por titulo       5. Buscar por ISBN        6. Ordenar por titulo   |")
+        print("| 4. Buscar por titulo       5. Buscar por ISBN        6. Listar ordenado      |")
+        print("| 7. Buscar por palabras     8. Libros por autor       9. Importar catálogo    |")
         print("|                         0. Volver al menú principal                          |")
         print("|------------------------------------------------------------------------------|")
         op = input("|  Seleccione una opción: ")
@@ -677,40 +4625,19 @@ def menu_libros(lib):
                 input("|  Presione Enter para continuar...")
             case "2":
                 isbn = input("|  ISBN del libro a eliminar: ")
-                libro_a_eliminar = lib.find_book_by_isbn(isbn)
-                eliminado = lib.books.remove(lambda b: b.isbn == isbn)
-                if eliminado:
-                    # Eliminar el nodo del grafo y sus relaciones si el libro es eliminado
-                    if libro_a_eliminar:
-                        lib.relations.adj.pop(libro_a_eliminar.title, None)
-                        for vecinos in lib.relations.adj.values():
-                            if libro_a_eliminar.title in vecinos:
-                                vecinos.remove(libro_a_eliminar.title)
-                    # Eliminar de la cola de préstamos cualquier solicitud pendiente de este libro
-                    nueva_cola = Queue()
-                    while not lib.loan_queue.is_empty():
-                        req = lib.loan_queue.dequeue()
-                        if req[1] != isbn:
-                            nueva_cola.enqueue(req)
-                    lib.loan_queue = nueva_cola
-                    # Eliminar de todas las categorías del árbol
-                    if libro_a_eliminar:
-                        lib.categories.remove_book(libro_a_eliminar.title)
+                # remove_book limpia tambien grafo, cola y categorias
+                eliminado = lib.remove_book(isbn)
                 print("|  Libro eliminado." if eliminado else "|  No se encontró el libro.")
                 input("|  Presione Enter para continuar...")
             case "3":
-                libros = lib.list_books()
-                if libros:
-                    tabla = [
-                        [str(b.title), str(b.author), str(b.isbn), "Disponible" if b.available else "Prestado"]
-                        for b in libros
-                    ]
-                    print(tabulate(tabla, headers=["Titulo", "Autor", "ISBN", "Estado"], tablefmt="grid", stralign="center"))
+                if mostrar_libros(lib.list_books()):
+                    print(f"|  Disponibles: {lib.count_available()}   Prestados: {lib.count_on_loan()}")
                 else:
                     print("|  No hay libros registrados.")
                 input("|  Presione Enter para continuar...")
             case "4":
-                title = input("|  Titulo: ")
+                print("|  Tab autocompleta; termine con '?' para ver sugerencias.")
+                title = pedir_titulo(lib, "|  Titulo: ")
                 res = lib.find_book_by_title(title)
                 if res:
                     tabla = [
@@ -719,6 +4646,12 @@ def menu_libros(lib):
                     print(tabulate(tabla, headers=["Titulo", "Autor", "ISBN", "Estado"], tablefmt="grid", stralign="center"))
                 else:
                     print("|  No encontrado.")
+                    # Sugerir titulos parecidos por si hubo un error de tipeo
+                    parecidos = lib.search_fuzzy(title)
+                    if parecidos:
+                        print("|  Quizás quiso decir:")
+                        for b, _ in parecidos:
+                            print(f"|    - {b.title} (ISBN {b.isbn})")
                 input("|  Presione Enter para continuar...")
             case "5":
                 isbn = input("|  ISBN: ")
@@ -732,8 +4665,48 @@ def menu_libros(lib):
                     print("|  No encontrado.")
                 input("|  Presione Enter para continuar...")
             case "6":
-                lib.sort_books_by_title()
-                print("|  Libros ordenados.")
+                print("|  Ordenar por: 1. Titulo  2. Autor  3. ISBN  4. Disponibilidad")
+                criterio = {"1": "titulo", "2": "autor", "3": "isbn", "4": "disponibilidad"}.get(input("|  Criterio: "))
+                if not criterio:
+                    print("|  Criterio inválido.")
+                else:
+                    libros = lib.sort_books_by_title() if criterio == "titulo" else lib.list_books(criterio)
+                    mostrar_libros(libros)
+                input("|  Presione Enter para continuar...")
+            case "7":
+                consulta = input("|  Palabras (titulo o autor): ")
+                resultados = lib.search_books(consulta, k=20)
+                if resultados:
+                    tabla = [
+                        [str(b.title), str(b.author), str(b.isbn), "Disponible" if b.available else "Prestado", f"{puntaje:.2f}"]
+                        for b, puntaje in resultados
+                    ]
+                    print(tabulate(tabla, headers=["Titulo", "Autor", "ISBN", "Estado", "Relevancia"], tablefmt="grid", stralign="center"))
+                else:
+                    print("|  No encontrado.")
+                input("|  Presione Enter para continuar...")
+            case "8":
+                autor = input("|  Autor (o inicio del nombre): ")
+                # Primero coincidencia exacta; si no hay, por prefijo
+                libros = lib.books_by_author(autor) or lib.books_by_author_prefix(autor)
+                if autor.strip() and libros:
+                    tabla = [
+                        [str(b.title), str(b.author), str(b.isbn), "Disponible" if b.available else "Prestado"]
+                        for b in libros
+                    ]
+                    print(tabulate(tabla, headers=["Titulo", "Autor", "ISBN", "Estado"], tablefmt="grid", stralign="center"))
+                else:
+                    print("|  No encontrado.")
+                input("|  Presione Enter para continuar...")
+            case "9":
+                ruta = input("|  Archivo CSV o JSONL: ").strip()
+                try:
+                    reporte = lib.import_books(ruta)
+                    print(f"|  Importación: {reporte}")
+                    if reporte.ejemplos_duplicados:
+                        print(f"|  ISBN repetidos (ejemplos): {', '.join(reporte.ejemplos_duplicados)}")
+                except (OSError, ValueError) as e:
+                    print(f"|  No se pudo importar: {e}")
                 input("|  Presione Enter para continuar...")
             case "0":
                 break
@@ -772,24 +4745,14 @@ def menu_usuarios(lib):
                 input("|  Presione Enter para continuar...")
             case "2":
                 uid = input("|  ID de usuario a eliminar: ")
-                eliminado = lib.users.remove(lambda u: u.user_id == uid)
-                # Eliminar préstamos pendientes de la cola si el usuario es eliminado
-                if eliminado:
-                    nueva_cola = Queue()
-                    while not lib.loan_queue.is_empty():
-                        req = lib.loan_queue.dequeue()
-                        if req[0] != uid:
-                            nueva_cola.enqueue(req)
-                    lib.loan_queue = nueva_cola
+                # remove_user elimina tambien sus préstamos pendientes de la cola
+                eliminado = lib.remove_user(uid)
                 print("|  Usuario eliminado." if eliminado else "|  No se encontró el usuario.")
                 input("|  Presione Enter para continuar...")
             case "3":
-                usuarios = lib.users.to_list()
-                if usuarios:
-                    tabla = [
-                        [str(u.user_id), str(u.name)]
-                        for u in usuarios
-                    ]
+                # Se recorre la lista ligada directamente, sin copiarla antes
+                tabla = [[str(u.user_id), str(u.name)] for u in lib.users]
+                if tabla:
                     print(tabulate(tabla, headers=["ID", "Nombre"], tablefmt="grid", stralign="center"))
                 else:
                     print("|  No hay usuarios registrados.")
@@ -824,7 +4787,7 @@ def menu_prestamos(lib):
                     input("|  Presione Enter para continuar...")
                     continue
                 # Evitar que el usuario solicite el mismo libro varias veces
-                if any(req[0] == uid and req[1] == isbn for req in lib.loan_queue.to_list()):
+                if lib.has_pending_request(uid, isbn):
                     print("|  Ya existe una solicitud pendiente para este libro y usuario.")
                     input("|  Presione Enter para continuar...")
                     continue
@@ -834,8 +4797,13 @@ def menu_prestamos(lib):
                 print(lib.process_next_loan())
                 input("|  Presione Enter para continuar...")
             case "3":
-                isbn = input("|  ISBN a devolver: ")
-                print(lib.return_book(isbn))
+                # Varios ISBN separados por coma se devuelven en un solo lote
+                isbns = [i.strip() for i in input("|  ISBN a devolver (varios separados por coma): ").split(",") if i.strip()]
+                if len(isbns) > 1:
+                    for isbn, res in zip(isbns, lib.return_books(isbns)):
+                        print(f"{res} ({isbn})")
+                else:
+                    print(lib.return_book(isbns[0] if isbns else ""))
                 input("|  Presione Enter para continuar...")
             case "0":
                 break
@@ -866,19 +4834,7 @@ def menu_categorias(lib):
                 print("|  Formato: Biblioteca/Categoria/Subcategoria")
                 path_str = input("|  Ruta: ")
                 path = path_str.split("/")
-                if len(path) < 2:
-                    print("|  Ruta inválida.")
-                else:
-                    padre = lib.categories.find(path[:-1])
-                    if padre:
-                        hijo = [c for c in padre.children if c.name == path[-1]]
-                        if hijo:
-                            padre.children.remove(hijo[0])
-                            print("|  Categoría eliminada.")
-                        else:
-                            print("|  No se encontró la subcategoría.")
-                    else:
-                        print("|  No se encontró la ruta padre.")
+                print(lib.remove_category(path))
                 input("|  Presione Enter para continuar...")
             case "3":
                 lib.show_categories()
@@ -898,41 +4854,26 @@ def menu_categorias(lib):
 
 # Funcion: menu_relaciones
 def menu_relaciones(lib):
-    from tkinter import Canvas, Toplevel
-    import math
+    from tkinter import Toplevel
 
 # Funcion: mostrar_grafo_en_ventana
     def mostrar_grafo_en_ventana(grafo, titulo="Relaciones entre libros (Grafo)"):
         nodos = list(grafo.adj.keys())
-        n = len(nodos)
-        if n == 0:
+        if not nodos:
             print("|  No hay relaciones registradas.")
             return
-        ventana = Toplevel()
-        ventana.title(titulo)
-        ancho = 700
-        alto = 500
-        canvas = Canvas(ventana, width=ancho, height=alto, bg="white")
-        canvas.pack(fill=tk.BOTH, expand=True)
-        radio = min(ancho, alto) // 2 - 60
-        centro_x, centro_y = ancho // 2, alto // 2
-        pos = {}
-        for i, nodo in enumerate(nodos):
-            ang = 2 * math.pi * i / n
-            x = centro_x + radio * math.cos(ang)
-            y = centro_y + radio * math.sin(ang)
-            pos[nodo] = (x, y)
+        # Mapa nodo -> indice precalculado (evita nodos.index por arista)
+        indice = {nodo: i for i, nodo in enumerate(nodos)}
+        aristas = []
         for nodo, vecinos in grafo.adj.items():
-            x1, y1 = pos[nodo]
+            i = indice[nodo]
             for vecino in vecinos:
-                if vecino in pos:
-                    x2, y2 = pos[vecino]
-                    if nodos.index(nodo) < nodos.index(vecino):
-                        canvas.create_line(x1, y1, x2, y2, fill="gray", width=2)
-        r_nodo = 25
-        for nodo, (x, y) in pos.items():
-            canvas.create_oval(x - r_nodo, y - r_nodo, x + r_nodo, y + r_nodo, fill="#cce5ff", outline="#333", width=2)
-            canvas.create_text(x, y, text=nodo, font=("Arial", 10, "bold"), width=80)
+                j = indice.get(vecino)
+                if j is not None and i < j:
+                    aristas.append((i, j))
+        ventana = Toplevel()
+        ventana.title(titulo)
+        VisorGrafo(ventana, nodos, aristas, etiqueta=lib.titulo_de)
         ventana.mainloop()
 
     while True:
@@ -946,28 +4887,17 @@ def menu_relaciones(lib):
             case "1":
                 print("|  Relacionar libros permite vincular dos libros para indicar que")
                 print("|  están conectados (por temática, autor, saga, etc).")
-                a = input("|  Titulo A (primer libro): ")
-                b = input("|  Titulo B (segundo libro): ")
-                # Cambié aquí: ahora comprueba existencia de ambos libros antes de relacionar
-                libro_a = lib.find_book_by_title(a)
-                libro_b = lib.find_book_by_title(b)
-                if not libro_a or not libro_b:
-                    print("|  Ambos libros deben existir para crear la relación.")
-                elif a == b:
-                    print("|  No se puede relacionar un libro consigo mismo.")
-                else:
-                    print(lib.relate_books(a, b))
+                print("|  Tab autocompleta; termine con '?' para ver sugerencias.")
+                a = pedir_titulo(lib, "|  Titulo o ISBN A (primer libro): ")
+                b = pedir_titulo(lib, "|  Titulo o ISBN B (segundo libro): ")
+                # relate_books comprueba que ambos libros existan y sean distintos
+                print(lib.relate_books(a, b))
                 input("|  Presione Enter para continuar...")
 
             case "2":
-                a = input("|  Titulo A: ")
-                b = input("|  Titulo B: ")
-                # Validar existencia de ambos titulos en el grafo
-                if a in lib.relations.adj and b in lib.relations.adj[a]:
-                    lib.relations.adj[a].remove(b)
-                if b in lib.relations.adj and a in lib.relations.adj[b]:
-                    lib.relations.adj[b].remove(a)
-                print("|  Relación eliminada")
+                a = input("|  Titulo o ISBN A: ")
+                b = input("|  Titulo o ISBN B: ")
+                print(lib.unrelate_books(a, b))
                 input("|  Presione Enter para continuar...")
 
             case "3":
@@ -1026,9 +4956,68 @@ def menu():
             case _:
                 limpiar_pantalla()
 
+# ======================================================================
+#region MEDICION DE MEMORIA
+# ======================================================================
+# Mide con tracemalloc cuantos bytes ocupa cada libro del catalogo (el
+# Book mas su Node en la lista ligada) con los registros actuales y con
+# dataclasses equivalentes sin slots, como eran antes. Los textos se
+# crean antes de medir para contar solo el costo de los registros.
+# Uso: python Proyecto_Biblioteca_inteligente.py --medir-memoria
+# ======================================================================
+
+# Funcion: medir_memoria_libros
+def medir_memoria_libros(n: int = 100_000) -> Dict[str, float]:
+    @dataclass
+    class BookConDict:
+        title: str
+        author: str
+        isbn: str
+        available: bool = True
+        book_id: int = 0
+
+    @dataclass
+    class NodeConDict:
+        data: Any
+        next: Optional[Any] = None
+
+    datos = [(f"Titulo {i}", f"Autor {i % 500}", f"978-{i:09d}") for i in range(n)]
+
+    def medir(clase_libro, clase_nodo):
+        tracemalloc.start()
+        inicio = tracemalloc.get_traced_memory()[0]
+        cabeza = None
+        for i, (t, a, isbn) in enumerate(datos, 1):
+            cabeza = clase_nodo(clase_libro(t, a, isbn, True, i), cabeza)
+        usado = tracemalloc.get_traced_memory()[0] - inicio
+        tracemalloc.stop()
+        del cabeza
+        return usado / n
+
+    return {"antes": medir(BookConDict, NodeConDict), "ahora": medir(Book, Node)}
+
+
 # ======================================================================
 #region EJECUTAR MENU POR DEFECTO
 # ======================================================================
 
 if __name__ == "__main__":
-    menu()
\ No newline at end of file
+    if sys.argv[1:] == ["--medir-memoria"]:
+        res = medir_memoria_libros()
+        print(f"Bytes por libro (Book + Node) sin slots: {res['antes']:.1f}")
+        print(f"Bytes por libro (Book + Node) con slots: {res['ahora']:.1f}")
+    elif sys.argv[1:2] == ["--importar"] and len(sys.argv) in (3, 4):
+        # python Proyecto_Biblioteca_inteligente.py --importar libros.csv
+        # cat libros.jsonl | python Proyecto_Biblioteca_inteligente.py --importar - jsonl
+        lib = Biblioteca()
+        reporte = lib.import_books(sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else None)
+        lib.guardar_datos()
+        print(f"Importación: {reporte}")
+    elif sys.argv[1:2] == ["--exportar"] and len(sys.argv) in (4, 5) and sys.argv[2] in SECCIONES_EXPORTACION:
+        # python Proyecto_Biblioteca_inteligente.py --exportar libros libros.csv
+        # python Proyecto_Biblioteca_inteligente.py --exportar relaciones - aristas
+        filas = Biblioteca().export(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) == 5 else None)
+        if sys.argv[3] != "-":
+            print(f"Exportación: {filas} filas escritas en {sys.argv[3]}")
+    else:
+        menu()
\ No newline at end of file